@@ -1,18 +1,26 @@
 """The Veolia integration."""
 
+import asyncio
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import device_registry as dr
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .coordinator import VeoliaDataUpdateCoordinator
+from .const import (
+    CONF_PRIMARY_SUBSCRIPTION,
+    CONF_ROLLING_WINDOWS,
+    DEFAULT_ROLLING_WINDOWS,
+    DOMAIN,
+    LOGGER,
+)
 from .data import VeoliaConfigEntry, VeoliaData
-from .sensor import LastIndexSensor
+from .services import async_setup_services
 
-__all__ = ["VeoliaData", "LastIndexSensor"]
+__all__ = ["VeoliaData"]
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -24,23 +32,105 @@ CONFIG_SCHEMA = cv.empty_config_schema(DOMAIN)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Veolia integration."""
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass, entry):
     """Set up Veolia from a config entry."""
-    coordinator = VeoliaDataUpdateCoordinator(hass)
-    await coordinator.async_config_entry_first_refresh()
+    # Pulls veolia_api and the recorder, only needed once an entry exists
+    from veolia_api.exceptions import VeoliaAPIError  # noqa: PLC0415
+
+    from .account import VeoliaAccount  # noqa: PLC0415
+    from .coordinator import VeoliaDataUpdateCoordinator  # noqa: PLC0415
+
+    account = VeoliaAccount(
+        hass, entry.entry_id, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+    )
+    # Start from the subscriptions and history of the last run when cached,
+    # keeping the portal out of the startup path
+    cached_meters = await account.async_load_meters()
+    meters = cached_meters
+    if not meters:
+        try:
+            meters = await account.async_discover()
+        except VeoliaAPIError as exception:
+            raise ConfigEntryAuthFailed(exception) from exception
+    if CONF_PRIMARY_SUBSCRIPTION not in entry.data:
+        # Pinned once, the portal does not list the subscriptions in a stable order
+        hass.config_entries.async_update_entry(
+            entry,
+            data={**entry.data, CONF_PRIMARY_SUBSCRIPTION: meters[0].subscription_id},
+        )
+    account.coordinators = {
+        meter.subscription_id: VeoliaDataUpdateCoordinator(hass, account, meter)
+        for meter in meters
+    }
+    coordinators = list(account.coordinators.values())
+    seeded = await asyncio.gather(
+        *(coordinator.async_load_cache() for coordinator in coordinators)
+    )
+    await asyncio.gather(
+        *(
+            coordinator.async_config_entry_first_refresh()
+            for coordinator, cached in zip(coordinators, seeded, strict=True)
+            if not cached
+        )
+    )
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    hass.data[DOMAIN][entry.entry_id] = account
 
     await hass.config_entries.async_forward_entry_setups(
         entry, ["sensor", "switch", "text", "binary_sensor"]
     )
+    for coordinator, cached in zip(coordinators, seeded, strict=True):
+        if cached:
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{coordinator.name} refresh"
+            )
+    if cached_meters:
+        entry.async_create_background_task(
+            hass,
+            _async_check_meters(hass, entry, account, cached_meters),
+            f"{DOMAIN} subscriptions discovery",
+        )
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     return True
 
 
+async def _async_check_meters(hass, entry, account, cached_meters) -> None:
+    """Reload the entry when the subscriptions changed since the last run."""
+    from veolia_api.exceptions import VeoliaAPIError  # noqa: PLC0415
+
+    try:
+        meters = await account.async_discover()
+    except VeoliaAPIError as exception:
+        LOGGER.debug("Subscriptions discovery failed: %s", exception)
+        return
+    if meters != cached_meters:
+        LOGGER.info("Subscriptions of %s changed, reloading", entry.title)
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def async_update_options(
+    hass: HomeAssistant,
+    entry: VeoliaConfigEntry,
+) -> None:
+    """Apply updated options."""
+    coordinators = hass.data[DOMAIN][entry.entry_id].coordinators.values()
+    windows = [
+        int(days)
+        for days in entry.options.get(CONF_ROLLING_WINDOWS, DEFAULT_ROLLING_WINDOWS)
+    ]
+    if any(windows != coordinator.rolling_windows for coordinator in coordinators):
+        # Rolling sensors are created at setup
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    for coordinator in coordinators:
+        coordinator.async_apply_options()
+
+
 async def async_unload_entry(
     hass: HomeAssistant,
     entry: VeoliaConfigEntry,
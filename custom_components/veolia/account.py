@@ -0,0 +1,175 @@
+"""Veolia account owning the login shared by all its subscriptions."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+import time
+from typing import Any
+
+from veolia_api import VeoliaAPI
+from veolia_api.constants import BACKEND_ISTEFR, GET, TYPE_FRONT, ConsumptionType
+from veolia_api.exceptions import VeoliaAPIGetDataError, VeoliaAPIResponseError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    METER_CONCURRENT_FETCHES,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_SETTLE_DAYS,
+    STORAGE_VERSION,
+)
+from .http_cache import CachedResponse, ResponseCache, cache_key, is_settled
+
+
+@dataclass(slots=True, frozen=True)
+class VeoliaMeter:
+    """Subscription of a Veolia account."""
+
+    subscription_id: str
+    meter_number: str | None
+    tiers_id: str
+    contact_id: str
+    pds_number: str | None = None
+    start_date: str | None = None
+
+
+class VeoliaMeterClient(VeoliaAPI):
+    """Client of one subscription, authenticated through the account."""
+
+    def __init__(self, account: VeoliaAccount, meter: VeoliaMeter) -> None:
+        """Initialize the client with the subscription identifiers."""
+        auth = account.client
+        super().__init__(auth.username, auth.password, auth.session)
+        self._account = account
+        data = self.account_data
+        data.id_abonnement = meter.subscription_id
+        data.numero_compteur = meter.meter_number
+        data.tiers_id = meter.tiers_id
+        data.contact_id = meter.contact_id
+        data.numero_pds = meter.pds_number
+        data.date_debut_abonnement = meter.start_date
+        self.cache = ResponseCache(RESPONSE_CACHE_TTL)
+
+    async def _get_consumption_data(
+        self,
+        data_type: ConsumptionType,
+        year: int,
+        month: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the cached consumption of a period, fetching it when stale."""
+        if data_type == ConsumptionType.YEARLY:
+            month = None
+        key = cache_key(data_type.value, year, month)
+        now = time.time()
+        if (entry := self.cache.get(key, now)) is not None:
+            return entry.body
+        body = await super()._get_consumption_data(data_type, year, month)
+        settled = is_settled(
+            body, year, month, dt_util.now().date(), RESPONSE_SETTLE_DAYS
+        )
+        self.cache.put(key, CachedResponse(body, now, immutable=settled))
+        return body
+
+    async def fetch_month(self, year: int, month: int) -> None:
+        """Fetch the daily consumption of one month again."""
+        await self._check_token()
+        self.cache.discard(cache_key(ConsumptionType.MONTHLY.value, year, month))
+        self.account_data.daily_consumption = await self._get_consumption_data(
+            ConsumptionType.MONTHLY, year, month
+        )
+
+    async def login(self) -> bool:
+        """Reuse the account token instead of logging in again."""
+        await self._check_token()
+        return True
+
+    async def _check_token(self) -> None:
+        """Copy the account token, refreshed once for all the subscriptions."""
+        await self._account.async_check_token()
+        self.account_data.access_token = self._account.client.account_data.access_token
+        self.account_data.token_expiration = (
+            self._account.client.account_data.token_expiration
+        )
+
+
+class VeoliaAccount:
+    """Single login and bounded fetches for the subscriptions of an entry."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, username: str, password: str
+    ) -> None:
+        """Initialize the account."""
+        self.client = VeoliaAPI(
+            username=username,
+            password=password,
+            session=async_get_clientsession(hass),
+        )
+        self.meters: list[VeoliaMeter] = []
+        self._store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.meters"
+        )
+        self.coordinators: dict = {}
+        self.fetch_semaphore = asyncio.Semaphore(METER_CONCURRENT_FETCHES)
+        self._token_lock = asyncio.Lock()
+        self.logins = 0
+
+    async def async_check_token(self) -> None:
+        """Log in if the token is missing or expired, once at a time."""
+        async with self._token_lock:
+            token = self.client.account_data.access_token
+            await self.client._check_token()  # noqa: SLF001
+            if self.client.account_data.access_token != token:
+                self.logins += 1
+
+    async def async_discover(self) -> list[VeoliaMeter]:
+        """Enumerate the subscriptions of the account."""
+        await self.async_check_token()
+        userdata = await self._async_get(
+            f"{BACKEND_ISTEFR}/espace-client?type-front={TYPE_FRONT}"
+        )
+        meters = []
+        for contact in userdata.get("contacts") or []:
+            for tiers in contact.get("tiers") or []:
+                for subscription in tiers.get("abonnements") or []:
+                    subscription_id = subscription.get("id_abonnement")
+                    if not subscription_id:
+                        continue
+                    billing = await self._async_get(
+                        f"{BACKEND_ISTEFR}/abonnements/{subscription_id}/facturation"
+                    )
+                    meters.append(
+                        VeoliaMeter(
+                            subscription_id=str(subscription_id),
+                            meter_number=subscription.get("numero_compteur"),
+                            tiers_id=tiers.get("id"),
+                            contact_id=contact.get("id_contact"),
+                            pds_number=billing.get("numero_pds"),
+                            start_date=billing.get("date_debut_abonnement"),
+                        )
+                    )
+        if not meters:
+            raise VeoliaAPIResponseError("No subscription found for the account")
+        LOGGER.debug("Found %s subscriptions", len(meters))
+        self.meters = meters
+        await self._store.async_save({"meters": [asdict(meter) for meter in meters]})
+        return meters
+
+    async def async_load_meters(self) -> list[VeoliaMeter]:
+        """Return the subscriptions discovered by the last run."""
+        stored = await self._store.async_load() or {}
+        self.meters = [VeoliaMeter(**meter) for meter in stored.get("meters", [])]
+        return self.meters
+
+    async def _async_get(self, url: str) -> dict:
+        """Return the JSON body of an authenticated GET request."""
+        response = await self.client._send_request(url=url, method=GET)  # noqa: SLF001
+        if response.status != HTTPStatus.OK:
+            raise VeoliaAPIGetDataError(f"{url} failed with status {response.status}")
+        return await response.json()
@@ -0,0 +1,50 @@
+"""Write-ahead log of the alert settings changes sent to Veolia."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+APPLIED = "applied"
+PENDING = "pending"
+CONFLICT = "conflict"
+
+
+@dataclass(slots=True)
+class AlertChange:
+    """Fields of the alert settings changed by one write."""
+
+    before: dict[str, Any]
+    after: dict[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable dict."""
+        return {"before": self.before, "after": self.after}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AlertChange:
+        """Build a change from its stored dict."""
+        return cls(before=dict(data["before"]), after=dict(data["after"]))
+
+    def resolve(self, settings: Any) -> str:
+        """Compare the change with the settings fetched from Veolia."""
+        if all(getattr(settings, k, None) == v for k, v in self.after.items()):
+            return APPLIED
+        if all(getattr(settings, k, None) == v for k, v in self.before.items()):
+            return PENDING
+        return CONFLICT
+
+    def apply(self, settings: Any) -> Any:
+        """Return a copy of the settings with the change applied."""
+        return replace(settings, **self.after)
+
+
+def diff_settings(current: Any, desired: Any) -> AlertChange | None:
+    """Return the change from current to desired settings, None if equal."""
+    before: dict[str, Any] = {}
+    after: dict[str, Any] = {}
+    for field in fields(current):
+        old, new = getattr(current, field.name), getattr(desired, field.name)
+        if old != new:
+            before[field.name], after[field.name] = old, new
+    return AlertChange(before, after) if after else None
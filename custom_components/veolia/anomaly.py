@@ -0,0 +1,144 @@
+"""Local leak and continuous-flow detection for Veolia."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+import math
+
+from .const import (
+    ANOMALY_CONTINUOUS_DAYS,
+    ANOMALY_FAST_ALPHA,
+    ANOMALY_MIN_DELTA_LITERS,
+    ANOMALY_SLOW_ALPHA,
+    ANOMALY_WARMUP_DAYS,
+    ANOMALY_Z_SCORE,
+)
+from .records import DailyRecord
+from .series import iter_new_readings
+
+BASELINE_SHIFT = "baseline_shift"
+ABSENCE_CONSUMPTION = "absence_consumption"
+CONTINUOUS_FLOW = "continuous_flow"
+
+
+@dataclass(slots=True)
+class AnomalyState:
+    """Result of the anomaly checks for the latest reading."""
+
+    last_day: date | None
+    last_liters: int | None
+    baseline_liters: float | None
+    recent_liters: float | None
+    above_baseline_days: int
+    baseline_shift: bool
+    absence_consumption: bool
+    continuous_flow: bool
+
+    def active(self) -> dict[str, bool]:
+        """Return the checks by name."""
+        return {
+            BASELINE_SHIFT: self.baseline_shift,
+            ABSENCE_CONSUMPTION: self.absence_consumption,
+            CONTINUOUS_FLOW: self.continuous_flow,
+        }
+
+    def payload(self) -> dict:
+        """Return a compact description of the latest evaluation."""
+        return {
+            "date": self.last_day.isoformat() if self.last_day else None,
+            "liters": self.last_liters,
+            "baseline_liters": _round(self.baseline_liters),
+            "recent_liters": _round(self.recent_liters),
+            "above_baseline_days": self.above_baseline_days,
+        }
+
+
+def _round(value: float | None) -> float | None:
+    """Round liters for display."""
+    return round(value, 1) if value is not None else None
+
+
+class VeoliaAnomalyDetector:
+    """Streaming detector fed one daily reading at a time."""
+
+    __slots__ = (
+        "_above_baseline_days",
+        "_fast_mean",
+        "_last_day",
+        "_last_liters",
+        "_samples",
+        "_slow_mean",
+        "_slow_var",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._last_day: date | None = None
+        self._last_liters: int | None = None
+        self._samples = 0
+        self._slow_mean = 0.0
+        self._slow_var = 0.0
+        self._fast_mean = 0.0
+        self._above_baseline_days = 0
+
+    @property
+    def last_day(self) -> date | None:
+        """Return the last day fed to the detector."""
+        return self._last_day
+
+    def feed(self, day: date, liters: int) -> None:
+        """Update the streaming statistics with a new daily reading."""
+        if self._last_day is not None and day <= self._last_day:
+            return
+        if self._samples == 0:
+            self._slow_mean = self._fast_mean = float(liters)
+        elif liters > self._slow_mean + math.sqrt(self._slow_var) / 2:
+            self._above_baseline_days += 1
+        else:
+            self._above_baseline_days = 0
+        # Exponentially weighted mean and variance, outliers only move the
+        # mean by a bounded step so an anomaly does not become the baseline
+        delta = liters - self._slow_mean
+        limit = self._threshold()
+        if self._samples >= ANOMALY_WARMUP_DAYS and abs(delta) > 1.5 * limit:
+            self._slow_mean += ANOMALY_SLOW_ALPHA * math.copysign(limit, delta)
+        else:
+            self._slow_mean += ANOMALY_SLOW_ALPHA * delta
+            self._slow_var = (1 - ANOMALY_SLOW_ALPHA) * (
+                self._slow_var + ANOMALY_SLOW_ALPHA * delta * delta
+            )
+        self._fast_mean += ANOMALY_FAST_ALPHA * (liters - self._fast_mean)
+        self._samples += 1
+        self._last_day = day
+        self._last_liters = liters
+
+    def feed_records(self, records: list[DailyRecord]) -> int:
+        """Feed the daily records newer than the last processed day."""
+        fed = 0
+        for day, liters in iter_new_readings(records, self._last_day):
+            self.feed(day, liters)
+            fed += 1
+        return fed
+
+    def _threshold(self) -> float:
+        """Return the deviation considered abnormal, in liters."""
+        return max(
+            ANOMALY_Z_SCORE * math.sqrt(self._slow_var), ANOMALY_MIN_DELTA_LITERS
+        )
+
+    def state(self, *, absent: bool) -> AnomalyState:
+        """Evaluate the checks against the latest reading."""
+        warm = self._samples >= ANOMALY_WARMUP_DAYS
+        threshold = self._threshold()
+        return AnomalyState(
+            last_day=self._last_day,
+            last_liters=self._last_liters,
+            baseline_liters=self._slow_mean if self._samples else None,
+            recent_liters=self._fast_mean if self._samples else None,
+            above_baseline_days=self._above_baseline_days,
+            baseline_shift=warm and self._fast_mean - self._slow_mean > threshold,
+            absence_consumption=bool(absent and self._last_liters),
+            continuous_flow=warm
+            and self._above_baseline_days >= ANOMALY_CONTINUOUS_DAYS,
+        )
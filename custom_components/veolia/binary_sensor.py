@@ -1,171 +1,108 @@
 """The Veolia binary sensor integration."""
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
-
-from .const import DOMAIN, LOGGER, NAME
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+
+from .anomaly import ABSENCE_CONSUMPTION, BASELINE_SHIFT, CONTINUOUS_FLOW
+from .const import DOMAIN, LOGGER
+from .entity import VeoliaDescriptionMixin, VeoliaEntity, alert_settings_slice
+from .model import VeoliaModel
+from .records import unoccupied_mode
+
+
+@dataclass(frozen=True, kw_only=True)
+class VeoliaBinarySensorEntityDescription(
+    BinarySensorEntityDescription, VeoliaDescriptionMixin
+):
+    """Describes a Veolia binary sensor."""
+
+
+def _alert_icon(is_on: bool | None) -> str:
+    """Return the icon of an alert state."""
+    return "mdi:bell-check" if is_on else "mdi:bell-cancel"
+
+
+def _anomaly_icon(is_on: bool | None) -> str:
+    """Return the icon of an anomaly state."""
+    return "mdi:water-alert" if is_on else "mdi:water-check"
+
+
+def _not_unoccupied(model: VeoliaModel) -> bool:
+    """Return true unless the daily alert is used as the unoccupied alert."""
+    return not unoccupied_mode(model.alert_settings)
+
+
+def _anomaly(check: str, model: VeoliaModel) -> bool | None:
+    """Return the state of a local anomaly check."""
+    return model.anomalies.active()[check] if model.anomalies else None
+
+
+def _anomaly_description(check: str) -> VeoliaBinarySensorEntityDescription:
+    """Describe the binary sensor of a local anomaly check."""
+    return VeoliaBinarySensorEntityDescription(
+        key=f"{check}_binary_sensor",
+        translation_key=f"{check}_binary_sensor",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=partial(_anomaly, check),
+        attributes_fn=lambda model: (
+            model.anomalies.payload() if model.anomalies else {}
+        ),
+        icon_fn=_anomaly_icon,
+    )
+
+
+BINARY_SENSORS: tuple[VeoliaBinarySensorEntityDescription, ...] = (
+    VeoliaBinarySensorEntityDescription(
+        key="daily_alert_binary_sensor",
+        translation_key="daily_alert_binary_sensor",
+        value_fn=lambda model: model.alert_settings.daily_enabled,
+        available_fn=_not_unoccupied,
+        icon_fn=_alert_icon,
+        slice_fn=alert_settings_slice,
+    ),
+    VeoliaBinarySensorEntityDescription(
+        key="monthly_alert_binary_sensor",
+        translation_key="monthly_alert_binary_sensor",
+        value_fn=lambda model: bool(model.alert_settings.monthly_enabled),
+        available_fn=_not_unoccupied,
+        icon_fn=_alert_icon,
+        slice_fn=alert_settings_slice,
+    ),
+    VeoliaBinarySensorEntityDescription(
+        key="unoccupied_alert_binary_sensor",
+        translation_key="unoccupied_alert_binary_sensor",
+        value_fn=lambda model: unoccupied_mode(model.alert_settings),
+        icon_fn=_alert_icon,
+        slice_fn=alert_settings_slice,
+    ),
+    *map(_anomaly_description, (BASELINE_SHIFT, ABSENCE_CONSUMPTION, CONTINUOUS_FLOW)),
+)
 
 
 async def async_setup_entry(hass, entry, async_add_devices) -> None:
-    """Set up switch platform."""
+    """Set up binary_sensor platform."""
     LOGGER.debug("Setting up binary_sensor platform")
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    switches = [
-        DailyAlerts(coordinator, entry),
-        MonthlyAlerts(coordinator, entry),
-        UnoccupiedAlert(coordinator, entry),
-    ]
-    async_add_devices(switches)
-
-
-class DailyAlerts(BinarySensorEntity):
-    """Representation of the first alert binary sensor."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-
-    @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
+    async_add_devices(
+        VeoliaBinarySensor(coordinator, entry, desc)
+        for coordinator in hass.data[DOMAIN][entry.entry_id].coordinators.values()
+        for desc in BINARY_SENSORS
+    )
 
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_daily_alert_binary_sensor"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
 
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "daily_alert_binary_sensor"
-
-    @property
-    def icon(self) -> str:
-        """Return the icon of the binary sensor."""
-        if bool(self.coordinator.data.alert_settings.daily_enabled):
-            return "mdi:bell-check"
-        return "mdi:bell-cancel"
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if the binary sensor is on."""
-        return self.coordinator.data.alert_settings.daily_enabled
-
-    @property
-    def available(self) -> bool:
-        """Return true if the binary sensor is available."""
-        return not (
-            self.coordinator.data.alert_settings.daily_enabled
-            and self.coordinator.data.alert_settings.daily_threshold == 0
-        )
-
-
-class MonthlyAlerts(BinarySensorEntity):
-    """Representation of the second alert binary sensor."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-
-    @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_monthly_alert_binary_sensor"
+class VeoliaBinarySensor(VeoliaEntity, BinarySensorEntity):
+    """Veolia binary sensor generated from a description."""
 
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "monthly_alert_binary_sensor"
-
-    @property
-    def icon(self) -> str:
-        """Return the icon of the binary sensor."""
-        if bool(self.coordinator.data.alert_settings.monthly_enabled):
-            return "mdi:bell-check"
-        return "mdi:bell-cancel"
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if the binary sensor is on."""
-        return bool(self.coordinator.data.alert_settings.monthly_enabled)
-
-    @property
-    def available(self) -> bool:
-        """Return true if the binary sensor is available."""
-        return not (
-            self.coordinator.data.alert_settings.daily_enabled
-            and self.coordinator.data.alert_settings.daily_threshold == 0
-        )
-
-
-class UnoccupiedAlert(BinarySensorEntity):
-    """Representation of the unoccupied alert binary sensor."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-
-    @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_unoccupied_alert_binary_sensor"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "unoccupied_alert_binary_sensor"
-
-    @property
-    def icon(self) -> str:
-        """Return the icon of the binary sensor."""
-        if self.is_on:
-            return "mdi:bell-check"
-        return "mdi:bell-cancel"
+    entity_description: VeoliaBinarySensorEntityDescription
 
     @property
-    def is_on(self) -> bool:
-        """Return true if the binary sensor is on."""
-        return (
-            self.coordinator.data.alert_settings.daily_enabled
-            and self.coordinator.data.alert_settings.daily_threshold == 0
-        )
+    def is_on(self) -> bool | None:
+        """Return the state evaluated at the last update."""
+        return self._value
@@ -1,15 +1,50 @@
 """Config flow for veolia integration."""
 
-import aiohttp
-from veolia_api import VeoliaAPI
-from veolia_api.exceptions import VeoliaAPIAuthError, VeoliaAPIInvalidCredentialsError
+from __future__ import annotations
+
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import (
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
+
+from .const import (
+    CONF_COMPACT_MONTHS,
+    CONF_ENERGY_DASHBOARD,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_FORWARD_FILL,
+    CONF_HISTORY_MONTHS,
+    CONF_IMPORT_STATISTICS,
+    CONF_INDEX_STATS,
+    CONF_LOOKBACK_MONTHS,
+    CONF_POLL_INTERVAL,
+    CONF_PRICE_CHANGES,
+    CONF_PRICE_PER_M3,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_YEARS,
+    CONF_ROLLING_WINDOWS,
+    CONF_SUBSCRIPTION,
+    CONF_VAT,
+    DEFAULT_COMPACT_MONTHS,
+    DEFAULT_HISTORY_MONTHS,
+    DEFAULT_LOOKBACK_MONTHS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_YEARS,
+    DEFAULT_ROLLING_WINDOWS,
+    DEFAULT_VAT,
+    DOMAIN,
+    LOGGER,
+)
+from .tariff import parse_price_changes
 
-from .const import DOMAIN, LOGGER
+_TARIFF_OPTIONS = (CONF_PRICE_PER_M3, CONF_SUBSCRIPTION, CONF_VAT, CONF_PRICE_CHANGES)
 
 
 class VeoliaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -24,6 +59,14 @@ class VeoliaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self._postal_code = None
         self._communes = []
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> VeoliaOptionsFlow:
+        """Get the options flow for this handler."""
+        return VeoliaOptionsFlow()
+
     async def async_step_user(self, user_input=None) -> dict:
         """Handle a flow initialized by the user."""
         self._errors = {}
@@ -58,12 +101,10 @@ class VeoliaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 self._errors["base"] = "commune_not_supported"
 
-        async with (
-            aiohttp.ClientSession() as session,
-            session.get(
-                f"https://prd-ael-sirius-refcommunes.istefr.fr/communes-nationales?q={self._postal_code}"
-            ) as response,
-        ):
+        session = async_get_clientsession(self.hass)
+        async with session.get(
+            f"https://prd-ael-sirius-refcommunes.istefr.fr/communes-nationales?q={self._postal_code}"
+        ) as response:
             self._communes = await response.json()
 
         if not self._communes:
@@ -83,6 +124,13 @@ class VeoliaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle the input of credentials."""
         LOGGER.debug("Request credentials")
         if user_input is not None:
+            # Only loaded once credentials are submitted
+            from veolia_api import VeoliaAPI  # noqa: PLC0415
+            from veolia_api.exceptions import (  # noqa: PLC0415
+                VeoliaAPIAuthError,
+                VeoliaAPIInvalidCredentialsError,
+            )
+
             try:
                 api = VeoliaAPI(
                     user_input[CONF_USERNAME],
@@ -115,3 +163,138 @@ class VeoliaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=self._errors,
         )
+
+
+class VeoliaOptionsFlow(config_entries.OptionsFlow):
+    """Options flow for veolia."""
+
+    async def async_step_init(self, user_input=None) -> dict:
+        """Choose the options to manage."""
+        return self.async_show_menu(step_id="init", menu_options=["settings", "tariff"])
+
+    async def async_step_settings(self, user_input=None) -> dict:
+        """Manage polling, history depth and features."""
+        errors = {}
+        if user_input is not None:
+            try:
+                windows = sorted(
+                    {int(days) for days in user_input[CONF_ROLLING_WINDOWS]}
+                )
+            except ValueError:
+                windows = []
+            if not windows or not all(1 <= days <= 366 for days in windows):
+                errors[CONF_ROLLING_WINDOWS] = "invalid_rolling_windows"
+            else:
+                user_input[CONF_ROLLING_WINDOWS] = windows
+                return self.async_create_entry(
+                    data={**self.config_entry.options, **user_input}
+                )
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_POLL_INTERVAL,
+                    default=options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=24)),
+                vol.Required(
+                    CONF_HISTORY_MONTHS,
+                    default=options.get(CONF_HISTORY_MONTHS, DEFAULT_HISTORY_MONTHS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Required(
+                    CONF_LOOKBACK_MONTHS,
+                    default=options.get(CONF_LOOKBACK_MONTHS, DEFAULT_LOOKBACK_MONTHS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=12)),
+                vol.Required(
+                    CONF_ROLLING_WINDOWS,
+                    default=[
+                        str(days)
+                        for days in options.get(
+                            CONF_ROLLING_WINDOWS, DEFAULT_ROLLING_WINDOWS
+                        )
+                    ],
+                ): SelectSelector(
+                    SelectSelectorConfig(
+                        options=["7", "14", "30", "90", "365"],
+                        multiple=True,
+                        custom_value=True,
+                        mode=SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+                vol.Required(
+                    CONF_IMPORT_STATISTICS,
+                    default=options.get(CONF_IMPORT_STATISTICS, True),
+                ): bool,
+                vol.Required(
+                    CONF_FORWARD_FILL, default=options.get(CONF_FORWARD_FILL, True)
+                ): bool,
+                vol.Required(
+                    CONF_INDEX_STATS, default=options.get(CONF_INDEX_STATS, True)
+                ): bool,
+                vol.Required(
+                    CONF_EXTERNAL_STATISTICS,
+                    default=options.get(CONF_EXTERNAL_STATISTICS, True),
+                ): bool,
+                vol.Required(
+                    CONF_ENERGY_DASHBOARD,
+                    default=options.get(CONF_ENERGY_DASHBOARD, False),
+                ): bool,
+                vol.Required(
+                    CONF_COMPACT_MONTHS,
+                    default=options.get(CONF_COMPACT_MONTHS, DEFAULT_COMPACT_MONTHS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=120)),
+                # Same month last year and yearly rolling windows need 400 days
+                vol.Required(
+                    CONF_RETENTION_DAYS,
+                    default=options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS),
+                ): vol.All(vol.Coerce(int), vol.Any(0, vol.Range(min=400, max=7300))),
+                vol.Required(
+                    CONF_RETENTION_YEARS,
+                    default=options.get(CONF_RETENTION_YEARS, DEFAULT_RETENTION_YEARS),
+                ): vol.All(vol.Coerce(int), vol.Any(0, vol.Range(min=2, max=50))),
+            }
+        )
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=self.add_suggested_values_to_schema(schema, user_input or {}),
+            errors=errors,
+        )
+
+    async def async_step_tariff(self, user_input=None) -> dict:
+        """Manage the water tariff."""
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_price_changes(user_input.get(CONF_PRICE_CHANGES))
+            except ValueError:
+                errors[CONF_PRICE_CHANGES] = "invalid_price_changes"
+            else:
+                # Cleared optional fields are absent from user_input
+                options = {
+                    key: value
+                    for key, value in self.config_entry.options.items()
+                    if key not in _TARIFF_OPTIONS
+                }
+                return self.async_create_entry(data={**options, **user_input})
+
+        schema = vol.Schema(
+            {
+                vol.Optional(CONF_PRICE_PER_M3): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_SUBSCRIPTION): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_VAT, default=DEFAULT_VAT): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=100)
+                ),
+                vol.Optional(CONF_PRICE_CHANGES): str,
+            }
+        )
+        return self.async_show_form(
+            step_id="tariff",
+            data_schema=self.add_suggested_values_to_schema(
+                schema, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
@@ -20,5 +20,79 @@ CONSO = "consommation"
 IDX_FIABILITY = "fiabilite_index"
 CONSO_FIABILITY = "fiabilite_conso"
 DATA_DATE = "date_releve"
+DATA_DATETIME = "date_heure_releve"
 YEAR = "annee"
 MONTH = "mois"
+
+# Subscription keeping the identifiers of single meter entries
+CONF_PRIMARY_SUBSCRIPTION = "primary_subscription_id"
+
+# Options
+CONF_POLL_INTERVAL = "poll_interval_hours"
+DEFAULT_POLL_INTERVAL = 6
+CONF_HISTORY_MONTHS = "initial_history_months"
+DEFAULT_HISTORY_MONTHS = 12
+CONF_LOOKBACK_MONTHS = "lookback_months"
+DEFAULT_LOOKBACK_MONTHS = 2
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_FORWARD_FILL = "forward_fill"
+CONF_INDEX_STATS = "index_stats"
+CONF_EXTERNAL_STATISTICS = "external_statistics"
+CONF_ENERGY_DASHBOARD = "energy_dashboard"
+CONF_COMPACT_MONTHS = "compact_after_months"
+DEFAULT_COMPACT_MONTHS = 24
+CONF_RETENTION_DAYS = "retention_days"
+DEFAULT_RETENTION_DAYS = 400
+CONF_RETENTION_YEARS = "retention_years"
+DEFAULT_RETENTION_YEARS = 5
+CONF_ROLLING_WINDOWS = "rolling_windows"
+DEFAULT_ROLLING_WINDOWS = [7, 30]
+CONF_PRICE_PER_M3 = "price_per_m3"
+CONF_SUBSCRIPTION = "subscription_per_year"
+CONF_VAT = "vat_rate"
+CONF_PRICE_CHANGES = "price_changes"
+DEFAULT_VAT = 5.5
+
+# Index reconciliation
+INDEX_JITTER_M3 = 1.0
+INDEX_REGISTER_SIZES_M3 = (10_000, 100_000, 1_000_000)
+MONTH_MISMATCH_M3 = 0.5
+MONTH_MISMATCH_RATIO = 0.05
+
+# Local anomaly detection
+EVENT_ANOMALY = "veolia_anomaly"
+ANOMALY_SLOW_ALPHA = 0.05
+ANOMALY_FAST_ALPHA = 0.3
+ANOMALY_Z_SCORE = 2.0
+ANOMALY_MIN_DELTA_LITERS = 50
+ANOMALY_WARMUP_DAYS = 14
+ANOMALY_CONTINUOUS_DAYS = 7
+
+# Subscriptions of an account fetched at the same time
+METER_CONCURRENT_FETCHES = 2
+
+# Reading events
+EVENT_NEW_READING = "veolia_new_reading"
+EVENT_MONTH_CLOSED = "veolia_month_closed"
+EVENT_THRESHOLD_CROSSED = "veolia_threshold_crossed"
+
+# Consumption forecast
+FORECAST_ALPHA = 0.1
+FORECAST_WARMUP_DAYS = 7
+FORECAST_Z_SCORE = 1.96
+
+# History export
+EXPORT_DIR = "veolia_export"
+EXPORT_CHUNK_ROWS = 1000
+
+# History import
+STORAGE_VERSION = 1
+SIGNAL_STATISTICS = "veolia_statistics_{}"
+STATISTICS_BATCH_ROWS = 2000
+
+# Startup cache, saved once the updates settle
+CACHE_SAVE_DELAY = 60
+
+# Consumption responses, kept for good once their period is closed and settled
+RESPONSE_CACHE_TTL = 600
+RESPONSE_SETTLE_DAYS = 7
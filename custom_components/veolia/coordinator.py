@@ -2,21 +2,82 @@
 
 from __future__ import annotations
 
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import asdict, replace
 from datetime import date, datetime, timedelta
+from operator import itemgetter
+import time
 from typing import TYPE_CHECKING
 
-from veolia_api import VeoliaAPI
+from aiohttp import ClientError
 from veolia_api.exceptions import VeoliaAPIError
+from veolia_api.model import AlertSettings
 
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, LOGGER
-from .data import VeoliaConfigEntry
-from .model import VeoliaModel
+from .account import VeoliaAccount, VeoliaMeter, VeoliaMeterClient
+from .alert_log import PENDING, AlertChange, diff_settings
+from .anomaly import AnomalyState, VeoliaAnomalyDetector
+from .const import (
+    CACHE_SAVE_DELAY,
+    CONF_COMPACT_MONTHS,
+    CONF_ENERGY_DASHBOARD,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_FORWARD_FILL,
+    CONF_HISTORY_MONTHS,
+    CONF_IMPORT_STATISTICS,
+    CONF_INDEX_STATS,
+    CONF_LOOKBACK_MONTHS,
+    CONF_POLL_INTERVAL,
+    CONF_PRIMARY_SUBSCRIPTION,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_YEARS,
+    CONF_ROLLING_WINDOWS,
+    DEFAULT_COMPACT_MONTHS,
+    DEFAULT_HISTORY_MONTHS,
+    DEFAULT_LOOKBACK_MONTHS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_YEARS,
+    DEFAULT_ROLLING_WINDOWS,
+    DOMAIN,
+    EVENT_ANOMALY,
+    LOGGER,
+    SIGNAL_STATISTICS,
+    STORAGE_VERSION,
+)
+from .data import VeoliaConfigEntry, VeoliaFetchStats
+from .events import reading_events
+from .external_statistics import (
+    async_import_external_index,
+    async_import_external_statistics,
+    async_register_energy_source,
+    compact_rows,
+)
+from .forecast import ForecastState, VeoliaForecaster
+from .model import HistoryBase, VeoliaModel, hourly_by_day, iter_archived_stats
+from .reconcile import Reconciliation, reconcile
+from .records import (
+    DailyRecord,
+    MonthlyRecord,
+    RecordError,
+    is_estimated,
+    parse_daily,
+    parse_monthly,
+    parse_records,
+    unoccupied_mode,
+    validate_alert_settings,
+)
+from .series import estimated_share
+from .tariff import TariffSchedule
+from .timeutil import day_start, months_before, rows_between
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -30,44 +91,738 @@ class VeoliaDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(
         self,
         hass: HomeAssistant,
+        account: VeoliaAccount,
+        meter: VeoliaMeter,
     ) -> None:
         """Initialize."""
         super().__init__(
             hass=hass,
             logger=LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(hours=6),
+            name=f"{DOMAIN} {meter.subscription_id}",
+            update_interval=timedelta(hours=DEFAULT_POLL_INTERVAL),
         )
-        LOGGER.debug("Initializing client VeoliaAPI")
+        LOGGER.debug("Initializing client of subscription %s", meter.subscription_id)
 
-        self.client_api = VeoliaAPI(
-            username=self.config_entry.data[CONF_USERNAME],
-            password=self.config_entry.data[CONF_PASSWORD],
-            session=async_get_clientsession(hass),
+        self.account = account
+        self.meter = meter
+        self.client_api = VeoliaMeterClient(account, meter)
+        entry_id = self.config_entry.entry_id
+        # The pinned subscription keeps the identifiers of single meter entries
+        self.unique_prefix = (
+            entry_id
+            if meter.subscription_id
+            == self.config_entry.data.get(CONF_PRIMARY_SUBSCRIPTION)
+            else f"{entry_id}_{meter.subscription_id}"
         )
 
         self._initial_historical_fetch = False
+        self._daily_history: dict[date, DailyRecord] = {}
+        self._monthly_history: dict[tuple[int, int], MonthlyRecord] = {}
+        # Sub-daily liters per local day and naive local hour
+        self._hourly_history: dict[date, dict[datetime, int]] = {}
+        self.daily_records: list[DailyRecord] = []
+        self.monthly_records: list[MonthlyRecord] = []
+        self.record_errors: list[RecordError] = []
+        self.reconciliation = Reconciliation()
+        self._imported_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.unique_prefix}.imported"
+        )
+        self._imported: dict[date, DailyRecord] = {}
+        # History of the last run, seeding the model before the first fetch
+        self._cache_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.unique_prefix}.cache"
+        )
+        # Rows older than the retention window, loaded back only when needed
+        self._archive_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.unique_prefix}.archive"
+        )
+        self.history_base = HistoryBase()
+        # Alert settings changes written ahead of the portal call
+        self._alert_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.unique_prefix}.alert_log"
+        )
+        self.alert_log: list[AlertChange] = []
+        self._alert_lock = asyncio.Lock()
+        # Serializes the fetches of the meter writing the same account data
+        self._fetch_lock = asyncio.Lock()
+        self._anomaly_detector = VeoliaAnomalyDetector()
+        self._active_anomalies: set[str] = set()
+        self._forecaster = VeoliaForecaster()
+        self.tariff = TariffSchedule.from_options(self.config_entry.options)
+        self.tariff_revision = 0
+        self.fetch_stats = VeoliaFetchStats()
+        options = self.config_entry.options
+        self.update_interval = timedelta(
+            hours=options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
+        )
+        self.rolling_windows = [
+            int(days)
+            for days in options.get(CONF_ROLLING_WINDOWS, DEFAULT_ROLLING_WINDOWS)
+        ]
+        self._history_months = options.get(CONF_HISTORY_MONTHS, DEFAULT_HISTORY_MONTHS)
+        self._model_options = self._get_model_options()
+        self._import_statistics = self.import_statistics
+        # Compaction cutoff of the last full import of the external statistic,
+        # False until the first one
+        self._external_cutoff: date | None | bool = False
+        self._energy_registered = False
+        # Earliest day whose statistics rows changed since the last publish
+        self._statistics_since: date | None = None
+        # True while the model comes from the cache, until a fetch succeeds
+        self._seeded = False
+
+    @property
+    def import_statistics(self) -> bool:
+        """Return whether the sensors import their history into statistics."""
+        return self.config_entry.options.get(CONF_IMPORT_STATISTICS, True)
+
+    def _get_model_options(self) -> dict[str, bool]:
+        """Return the model options of the config entry."""
+        options = self.config_entry.options
+        return {
+            "forward_fill": options.get(CONF_FORWARD_FILL, True),
+            "index_stats": options.get(CONF_INDEX_STATS, True),
+        }
 
     async def _async_update_data(self) -> VeoliaModel:
         """Fetch and calculate data."""
         try:
-            now = datetime.now()
+            now = dt_util.now()
+            end_date = date(now.year, now.month, 1)
 
             if not self._initial_historical_fetch:
                 # First init
-                LOGGER.debug("Initial fetch 1 year")
-                end_date = date(now.year, now.month, 1)
-                start_date = date(end_date.year - 1, end_date.month, 1)
+                LOGGER.debug("Initial fetch %s months", self._history_months)
+                await self._async_load_imported()
+                start_date = months_before(end_date, self._history_months)
                 self._initial_historical_fetch = True
             else:
-                # Regular fetch
-                LOGGER.debug("Periodic fetch - 2 months")
-                start_date = date(now.year, now.month - 1, 1)
-                end_date = date(now.year, now.month, 1)
+                # Regular fetch, current month included
+                months = self.config_entry.options.get(
+                    CONF_LOOKBACK_MONTHS, DEFAULT_LOOKBACK_MONTHS
+                )
+                LOGGER.debug("Periodic fetch - %s months", months)
+                start_date = months_before(end_date, months - 1)
+            # Archiving reads the published sums, not up to date after a restore
+            if not await self._async_restore_archive(start_date):
+                await self._async_archive_history(end_date)
 
-            await self.client_api.fetch_all_data(start_date, end_date)
-            account_data = self.client_api.account_data
-            today = dt_util.now().date()
-            return VeoliaModel.from_account_data(account_data, today=today)
+            started = time.monotonic()
+            async with self._fetch_lock, self.account.fetch_semaphore:
+                await self.client_api.fetch_all_data(start_date, end_date)
         except VeoliaAPIError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
+        if self.alert_log:
+            await self._async_replay_alert_log()
+        stats = self.fetch_stats
+        stats.updates += 1
+        stats.fetch_start, stats.fetch_end = start_date, end_date
+        stats.fetch_seconds = round(time.monotonic() - started, 3)
+        account_data = self.client_api.account_data
+        self._merge_history(account_data)
+        self._seeded = False
+        return self._build_model(account_data)
+
+    def _build_model(self, account_data) -> VeoliaModel:
+        """Compute the model from the merged history."""
+        started = time.monotonic()
+        today = dt_util.now().date()
+        model = VeoliaModel.from_account_data(
+            account_data,
+            self.daily_records,
+            self.monthly_records,
+            today=today,
+            tz=dt_util.get_default_time_zone(),
+            tariff=self.tariff,
+            index_points=self.reconciliation.index_points,
+            base=self.history_base,
+            hourly=self._hourly_history,
+            **self._model_options,
+        )
+        model.anomalies = self._detect_anomalies(account_data)
+        model.forecast = self._forecast(model)
+        self.fetch_stats.compute_seconds = round(time.monotonic() - started, 3)
+        return model
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply updated options, recomputing the cached history without a fetch."""
+        options = self.config_entry.options
+        self.update_interval = timedelta(
+            hours=options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
+        )
+        history_months = options.get(CONF_HISTORY_MONTHS, DEFAULT_HISTORY_MONTHS)
+        if history_months > self._history_months:
+            # Backfill the deeper history on the next poll
+            self._initial_historical_fetch = False
+        self._history_months = history_months
+
+        model_options = self._get_model_options()
+        tariff = TariffSchedule.from_options(options)
+        if tariff != self.tariff or model_options != self._model_options:
+            LOGGER.debug("Tariff or model options updated, recomputing history")
+            repriced = tariff != self.tariff
+            if repriced:
+                self.tariff = tariff
+                self.tariff_revision += 1
+            if model_options != self._model_options and (
+                points := self.reconciliation.index_points
+            ):
+                # The index statistics follow the fill and import options
+                self._mark_changed(points[0][0])
+            self._model_options = model_options
+            if repriced and self.history_base.archived:
+                # The archived rows are priced again with the new tariff
+                self.config_entry.async_create_task(
+                    self.hass, self.async_load_archive()
+                )
+            elif self.data is not None:
+                self.async_set_updated_data(self._build_model(self.data.raw))
+        if self.import_statistics and not self._import_statistics:
+            # The history skipped while disabled is imported again
+            async_dispatcher_send(
+                self.hass, SIGNAL_STATISTICS.format(self.unique_prefix), None, None
+            )
+        self._import_statistics = self.import_statistics
+        if self.data is not None:
+            self._async_update_external_statistics(self.data)
+
+    async def _async_load_imported(self) -> None:
+        """Load the history imported from files, fetched records take precedence."""
+        stored = await self._imported_store.async_load() or {}
+        self._imported = {
+            rec.day: rec for rec in map(DailyRecord.from_dict, stored.get("daily", []))
+        }
+        self._daily_history = {**self._imported, **self._daily_history}
+        stored = await self._alert_store.async_load() or {}
+        self.alert_log = [AlertChange.from_dict(c) for c in stored.get("changes", [])]
+
+    async def _async_save_alert_log(self) -> None:
+        """Persist the alert settings changes not yet confirmed by Veolia."""
+        await self._alert_store.async_save(
+            {"changes": [change.as_dict() for change in self.alert_log]}
+        )
+
+    async def _async_replay_alert_log(self) -> None:
+        """Replay the changes interrupted before Veolia confirmed them."""
+        account_data = self.client_api.account_data
+        async with self._alert_lock:
+            settings = account_data.alert_settings
+            if not self.alert_log or settings is None:
+                # Kept until settings are fetched to resolve the changes against
+                return
+            unresolved: list[AlertChange] = []
+            for change in self.alert_log:
+                state = change.resolve(settings)
+                if state != PENDING:
+                    # Applied before the restart, or edited since on the portal
+                    LOGGER.debug("Dropping %s alert settings change %s", state, change)
+                    continue
+                desired = change.apply(settings)
+                try:
+                    await self.client_api.set_alerts_settings(desired)
+                except (VeoliaAPIError, ClientError, TimeoutError) as exception:
+                    LOGGER.warning("Failed to replay %s: %s", change, exception)
+                    unresolved.append(change)
+                    continue
+                account_data.alert_settings = settings = desired
+            self.alert_log = unresolved
+            await self._async_save_alert_log()
+
+    async def async_set_alert_settings(self, edit: Callable[[object], None]) -> None:
+        """Write the alert settings edited by edit, logging the change ahead."""
+        async with self._alert_lock:
+            account_data = self.client_api.account_data
+            current = account_data.alert_settings
+            if current is None:
+                raise HomeAssistantError(
+                    translation_domain=DOMAIN,
+                    translation_key="alert_settings_unavailable",
+                )
+            desired = replace(current)
+            edit(desired)
+            change = diff_settings(current, desired)
+            if change is None:
+                return
+            self.alert_log.append(change)
+            await self._async_save_alert_log()
+            try:
+                await self.client_api.set_alerts_settings(desired)
+            except (VeoliaAPIError, ClientError, TimeoutError) as exception:
+                raise HomeAssistantError(exception) from exception
+            finally:
+                self.alert_log.remove(change)
+                await self._async_save_alert_log()
+            account_data.alert_settings = desired
+        if self.data is not None:
+            self.async_set_updated_data(self._build_model(account_data))
+
+    async def async_refresh_consumption(self) -> None:
+        """Fetch the consumption of the current month only."""
+        month_start = dt_util.now().date().replace(day=1)
+        try:
+            async with self._fetch_lock, self.account.fetch_semaphore:
+                await self.client_api.fetch_month(month_start.year, month_start.month)
+        except VeoliaAPIError as exception:
+            raise HomeAssistantError(exception) from exception
+        account_data = self.client_api.account_data
+        self._merge_history(account_data)
+        self.async_set_updated_data(self._build_model(account_data))
+
+    async def async_refresh_alert_settings(self) -> None:
+        """Fetch the alert settings only."""
+        try:
+            settings = await self.client_api.get_alerts_settings()
+        except VeoliaAPIError as exception:
+            raise HomeAssistantError(exception) from exception
+        errors: list[RecordError] = []
+        validate_alert_settings(settings, errors)
+        self._report_errors(errors)
+        account_data = self.client_api.account_data
+        account_data.alert_settings = settings
+        if self.data is not None:
+            self.async_set_updated_data(self._build_model(account_data))
+
+    async def async_load_cache(self) -> bool:
+        """Seed the model from the cached history, return False without cache."""
+        await self._async_load_imported()
+        stored = await self._cache_store.async_load()
+        if not stored:
+            return False
+        self.client_api.cache.load(stored.get("responses", {}))
+        self.history_base = HistoryBase.from_dict(stored.get("base") or {})
+        cutoff = stored.get("external_cutoff", False)
+        self._external_cutoff = (
+            date.fromisoformat(cutoff) if isinstance(cutoff, str) else cutoff
+        )
+        self._daily_history.update(
+            (rec.day, rec) for rec in map(DailyRecord.from_dict, stored["daily"])
+        )
+        self._monthly_history = {
+            (rec.year, rec.month): rec
+            for rec in map(MonthlyRecord.from_dict, stored["monthly"])
+        }
+        for hour, liters in stored.get("hourly", []):
+            hour = datetime.fromisoformat(hour)
+            self._hourly_history.setdefault(hour.date(), {})[hour] = liters
+        account_data = self.client_api.account_data
+        if stored.get("alert_settings") is not None:
+            account_data.alert_settings = AlertSettings(**stored["alert_settings"])
+        # Anomalies already raised before the restart are not fired again
+        self._active_anomalies = set(stored.get("anomalies", []))
+        self._apply_history()
+        LOGGER.debug(
+            "Seeded %s from %s cached daily readings",
+            self.name,
+            len(self.daily_records),
+        )
+        self.data = self._build_model(account_data)
+        self._seeded = True
+        return True
+
+    def _cache_data(self) -> dict:
+        """Return the history to cache, without the readings imported from files."""
+        settings = self.client_api.account_data.alert_settings
+        return {
+            "daily": [
+                rec.as_dict()
+                for day, rec in sorted(self._daily_history.items())
+                if self._imported.get(day) != rec
+            ],
+            "monthly": [
+                rec.as_dict() for _, rec in sorted(self._monthly_history.items())
+            ],
+            "hourly": [
+                [hour.isoformat(), liters]
+                for _, hours in sorted(self._hourly_history.items())
+                for hour, liters in sorted(hours.items())
+            ],
+            "alert_settings": asdict(settings) if settings is not None else None,
+            "anomalies": sorted(self._active_anomalies),
+            "responses": self.client_api.cache.as_dict(),
+            "base": self.history_base.as_dict(),
+            "external_cutoff": (
+                cutoff.isoformat()
+                if isinstance(cutoff := self._external_cutoff, date)
+                else cutoff
+            ),
+        }
+
+    def _retention_cutoffs(self, month_start: date) -> tuple[date | None, date | None]:
+        """Return the first day kept in memory of the daily and monthly rows."""
+        options = self.config_entry.options
+        days = options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS)
+        years = options.get(CONF_RETENTION_YEARS, DEFAULT_RETENTION_YEARS)
+        # The initial fetch window always stays in memory
+        history_start = months_before(month_start, self._history_months)
+        today = dt_util.now().date()
+        # Whole months, so that rows are archived once a month
+        daily = (
+            min((today - timedelta(days=days)).replace(day=1), history_start)
+            if days
+            else None
+        )
+        monthly = (
+            min(date(today.year - years, 1, 1), history_start.replace(month=1))
+            if years
+            else None
+        )
+        return daily, monthly
+
+    async def _async_archive_history(self, month_start: date) -> None:
+        """Move the rows older than the retention window to the archive."""
+        self.client_api.cache.prune(months_before(month_start, self._history_months))
+        if self.data is None:
+            return
+        daily_cut, monthly_cut = self._retention_cutoffs(month_start)
+        old_days = sorted(d for d in self._daily_history if daily_cut and d < daily_cut)
+        old_months = sorted(
+            k
+            for k in self._monthly_history
+            if monthly_cut and date(*k, 1) < monthly_cut
+        )
+        if not old_days and not old_months:
+            return
+        stored = await self._archive_store.async_load() or {}
+        daily = {row["day"]: row for row in stored.get("daily", [])}
+        daily.update(
+            (d.isoformat(), self._daily_history[d].as_dict()) for d in old_days
+        )
+        monthly = {
+            (row["year"], row["month"]): row for row in stored.get("monthly", [])
+        }
+        monthly.update((k, self._monthly_history[k].as_dict()) for k in old_months)
+        await self._archive_store.async_save(
+            {
+                "daily": [daily[k] for k in sorted(daily)],
+                "monthly": [monthly[k] for k in sorted(monthly)],
+            }
+        )
+
+        # Continue the sums published for the archived rows
+        comp = self.data.computed
+        base = self.history_base
+        tz = dt_util.get_default_time_zone()
+        if old_days:
+            i = bisect_left(
+                comp.daily_stats_liters,
+                day_start(daily_cut, tz),
+                key=itemgetter("start"),
+            )
+            if i:
+                base.liters = comp.daily_stats_liters[i - 1]["sum"]
+                if comp.daily_cost_stats:
+                    base.daily_cost = comp.daily_cost_stats[i - 1]["sum"]
+            base.daily_since = daily_cut
+            # The index offsets of the archived rollovers and replacements
+            base.index = reconcile(
+                [self._daily_history[d] for d in old_days], [], base.index
+            ).index_state
+        if old_months:
+            i = bisect_left(
+                comp.monthly_stats_cubic_meters,
+                day_start(monthly_cut, tz),
+                key=itemgetter("start"),
+            )
+            if i:
+                base.m3 = comp.monthly_stats_cubic_meters[i - 1]["sum"]
+                if comp.monthly_cost_stats:
+                    base.monthly_cost = comp.monthly_cost_stats[i - 1]["sum"]
+            base.monthly_since = monthly_cut
+        for d in old_days:
+            del self._daily_history[d]
+            self._hourly_history.pop(d, None)
+        for k in old_months:
+            del self._monthly_history[k]
+        if any(self._imported.pop(d, None) for d in old_days):
+            await self._imported_store.async_save(
+                {"daily": [self._imported[k].as_dict() for k in sorted(self._imported)]}
+            )
+        self._apply_history()
+        LOGGER.debug(
+            "Archived %s daily and %s monthly rows of %s",
+            len(old_days),
+            len(old_months),
+            self.name,
+        )
+
+    async def async_load_archive(self, since: date | None = None) -> None:
+        """Load the archived rows back and publish them if since needs them."""
+        if await self._async_restore_archive(since) and self.data is not None:
+            self.async_set_updated_data(self._build_model(self.data.raw))
+
+    async def _async_restore_archive(self, since: date | None) -> bool:
+        """Merge the archived rows back into the history if since needs them."""
+        if self.history_base.covers(since):
+            return False
+        stored = await self._archive_store.async_load() or {}
+        LOGGER.debug("Loading the archived history of %s", self.name)
+        archived = {
+            rec.day: rec for rec in map(DailyRecord.from_dict, stored.get("daily", []))
+        }
+        self._daily_history = {**archived, **self._daily_history}
+        archived_months = {
+            (rec.year, rec.month): rec
+            for rec in map(MonthlyRecord.from_dict, stored.get("monthly", []))
+        }
+        self._monthly_history = {**archived_months, **self._monthly_history}
+        self.history_base = HistoryBase()
+        self._apply_history()
+        return True
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Publish the update, then re-import the statistics rows that changed."""
+        if self._seeded and not self.last_update_success:
+            # The cached history stays valid, Veolia is only unreachable
+            LOGGER.warning(
+                "Fetching %s failed, keeping the cached history: %s",
+                self.name,
+                self.last_exception,
+            )
+            self.last_update_success = True
+        elif self.last_update_success and self.data is not None:
+            self._cache_store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY)
+        super().async_update_listeners()
+        if self._statistics_since is not None and self.data is not None:
+            since, self._statistics_since = self._statistics_since, None
+            LOGGER.debug("Re-importing statistics since %s", since)
+            self.async_rebuild_statistics(since)
+
+    def _mark_changed(self, day: date) -> None:
+        """Schedule the re-import of the statistics from day onwards."""
+        if self._statistics_since is None or day < self._statistics_since:
+            self._statistics_since = day
+        self.fetch_stats.statistics_since = self._statistics_since
+
+    @callback
+    def async_rebuild_statistics(
+        self, start: date | None = None, end: date | None = None
+    ) -> None:
+        """Re-import the statistics of the days from start to end."""
+        async_dispatcher_send(
+            self.hass, SIGNAL_STATISTICS.format(self.unique_prefix), start, end
+        )
+        if self.data is not None:
+            self._async_update_external_statistics(self.data, start, end)
+
+    @callback
+    def _async_update_external_statistics(
+        self, model: VeoliaModel, since: date | None = None, until: date | None = None
+    ) -> None:
+        """Import the external water and index statistics from since to until."""
+        options = self.config_entry.options
+        meter_id = model.raw.id_abonnement
+        if not options.get(CONF_EXTERNAL_STATISTICS, True) or not meter_id:
+            return
+        if options.get(CONF_ENERGY_DASHBOARD, False) and not self._energy_registered:
+            self._energy_registered = True
+            self.hass.async_create_task(
+                async_register_energy_source(self.hass, meter_id)
+            )
+        comp = model.computed
+        tz = dt_util.get_default_time_zone()
+        if comp.index_stats_m3:
+            # Absolute sums, a partial re-import never needs a rewrite
+            async_import_external_index(
+                self.hass,
+                meter_id,
+                rows_between(comp.index_stats_m3, since, until, tz),
+            )
+        rows = comp.hourly_stats_liters or comp.daily_stats_liters
+        months = options.get(CONF_COMPACT_MONTHS, DEFAULT_COMPACT_MONTHS)
+        cutoff = None
+        if months:
+            cutoff = months_before(dt_util.now().date().replace(day=1), months)
+            rows = compact_rows(rows, day_start(cutoff, tz), tz)
+        # Rows imported before a compaction are only removed by a full rewrite
+        full = self._external_cutoff is False or cutoff != self._external_cutoff
+        if full:
+            LOGGER.debug("Rewriting external statistic, compacted before %s", cutoff)
+            self._external_cutoff = cutoff
+            # A restart only rewrites the statistic if the cutoff moved since
+            self._cache_store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY)
+        if full and cutoff is not None and self.history_base.archived:
+            self.config_entry.async_create_task(
+                self.hass,
+                self._async_rewrite_external_statistics(
+                    meter_id, comp.hourly_stats_liters or comp.daily_stats_liters
+                ),
+            )
+            return
+        if not full:
+            rows = rows_between(rows, since, until, tz)
+        async_import_external_statistics(
+            self.hass, meter_id, rows, clear=full and cutoff is not None
+        )
+
+    async def _async_rewrite_external_statistics(
+        self, meter_id: str, rows: list[dict]
+    ) -> None:
+        """Clear and import the external statistic with the archived rows."""
+        tz = dt_util.get_default_time_zone()
+        stored = await self.async_load_archived()
+        archived = list(iter_archived_stats(stored, "daily", tz))
+        rows = archived + rows
+        if cutoff := self._external_cutoff:
+            rows = compact_rows(rows, day_start(cutoff, tz), tz)
+        LOGGER.debug(
+            "Rewriting external statistic of %s with %s archived days",
+            self.name,
+            len(archived),
+        )
+        async_import_external_statistics(self.hass, meter_id, rows, clear=True)
+
+    async def async_load_archived(self) -> dict:
+        """Return the archived rows as stored, the history in memory unchanged."""
+        if not self.history_base.archived:
+            return {}
+        return await self._archive_store.async_load() or {}
+
+    async def async_known_days(self) -> frozenset[date]:
+        """Return the days already in the history, archived ones included."""
+        stored = await self.async_load_archived()
+        return frozenset(self._daily_history).union(
+            date.fromisoformat(row["day"]) for row in stored.get("daily", [])
+        )
+
+    async def async_import_history(self, records: list[DailyRecord]) -> int:
+        """Add imported daily records missing from the history."""
+        if records:
+            await self.async_load_archive(min(rec.day for rec in records))
+        new = {rec.day: rec for rec in records if rec.day not in self._daily_history}
+        if not new:
+            return 0
+        self._imported.update(new)
+        await self._imported_store.async_save(
+            {"daily": [self._imported[k].as_dict() for k in sorted(self._imported)]}
+        )
+        self._daily_history.update(new)
+        self._mark_changed(min(new))
+        self._apply_history()
+        if self.data is not None:
+            self.async_set_updated_data(self._build_model(self.data.raw))
+        return len(new)
+
+    async def async_estimated_share(
+        self, start: date | None = None, end: date | None = None
+    ) -> dict:
+        """Return the share of estimated readings between start and end."""
+        await self.async_load_archive(start)
+        return estimated_share(self.daily_records, start, end)
+
+    def _merge_history(self, account_data) -> None:
+        """Validate fetched records and merge them into the history."""
+        errors: list[RecordError] = []
+        daily = parse_records(
+            "daily", account_data.daily_consumption or [], parse_daily, errors
+        )
+        monthly = parse_records(
+            "monthly", account_data.monthly_consumption or [], parse_monthly, errors
+        )
+        if account_data.alert_settings is not None:
+            validate_alert_settings(account_data.alert_settings, errors)
+        self._report_errors(errors)
+        last_day = self.daily_records[-1].day if self.daily_records else None
+        for rec in daily:
+            old = self._daily_history.get(rec.day)
+            if old == rec:
+                continue
+            if old and is_estimated(old.fiability) and not is_estimated(rec.fiability):
+                LOGGER.debug("Estimated reading of %s replaced: %s", rec.day, rec)
+                self.fetch_stats.corrected_records += 1
+            self._daily_history[rec.day] = rec
+            self._mark_changed(rec.day)
+        for rec in monthly:
+            if self._monthly_history.get((rec.year, rec.month)) != rec:
+                self._monthly_history[rec.year, rec.month] = rec
+                self._mark_changed(rec.first)
+        # Hours missing from this fetch keep the readings merged before
+        hourly = hourly_by_day(
+            getattr(account_data, "hourly_consumption", None) or [],
+            dt_util.get_default_time_zone(),
+        )
+        for day, hours in hourly.items():
+            old_hours = self._hourly_history.get(day, {})
+            if (merged := {**old_hours, **hours}) != old_hours:
+                self._hourly_history[day] = merged
+                self._mark_changed(day)
+        self._apply_history()
+        if last_day is not None:
+            self._fire_reading_events(last_day, account_data.alert_settings)
+
+    def _fire_reading_events(self, last_day: date, settings) -> None:
+        """Fire the events of the daily readings newer than last_day."""
+        for event_type, payload in reading_events(
+            self.daily_records, last_day, settings
+        ):
+            LOGGER.debug("Firing %s: %s", event_type, payload)
+            self.hass.bus.async_fire(
+                event_type,
+                {
+                    "config_entry_id": self.config_entry.entry_id,
+                    "subscription_id": self.meter.subscription_id,
+                    **payload,
+                },
+            )
+
+    def _report_errors(self, errors: list[RecordError]) -> None:
+        """Log and keep the rows rejected by the last validation."""
+        self.record_errors = errors
+        self.fetch_stats.invalid_records = len(errors)
+        for error in errors:
+            LOGGER.warning(
+                "Ignoring invalid %s record #%s: %s",
+                error.kind,
+                error.position,
+                error.reason,
+            )
+
+    def _apply_history(self) -> None:
+        """Sort and reconcile the merged history."""
+        reconciliation = reconcile(
+            [self._daily_history[k] for k in sorted(self._daily_history)],
+            [self._monthly_history[k] for k in sorted(self._monthly_history)],
+            self.history_base.index,
+        )
+        known = set(self.reconciliation.events)
+        for event in reconciliation.events:
+            if event not in known:
+                LOGGER.info(
+                    "Meter %s detected on %s, index %s -> %s m3",
+                    event.kind,
+                    event.day,
+                    event.previous_m3,
+                    event.index_m3,
+                )
+        self.reconciliation = reconciliation
+        self.daily_records = reconciliation.daily
+        self.monthly_records = reconciliation.monthly
+
+    def _detect_anomalies(self, account_data) -> AnomalyState:
+        """Feed new daily readings to the detector and fire raised anomalies."""
+        fed = self._anomaly_detector.feed_records(self.daily_records)
+        LOGGER.debug("Anomaly detector fed with %s new readings", fed)
+        state = self._anomaly_detector.state(
+            absent=unoccupied_mode(account_data.alert_settings)
+        )
+        active = {name for name, on in state.active().items() if on}
+        for name in active - self._active_anomalies:
+            LOGGER.debug("Anomaly %s raised", name)
+            self.hass.bus.async_fire(
+                EVENT_ANOMALY,
+                {
+                    "config_entry_id": self.config_entry.entry_id,
+                    "subscription_id": self.meter.subscription_id,
+                    "type": name,
+                    **state.payload(),
+                },
+            )
+        self._active_anomalies = active
+        return state
+
+    def _forecast(self, model: VeoliaModel) -> ForecastState | None:
+        """Update the forecaster with new readings and project totals."""
+        self._forecaster.update(self.daily_records, self.monthly_records)
+        comp = model.computed
+        return self._forecaster.state(comp.daily_series, comp.monthly_aggregate)
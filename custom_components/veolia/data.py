@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import date
 from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
@@ -24,3 +25,17 @@ class VeoliaData:
     client: VeoliaAPI
     coordinator: VeoliaDataUpdateCoordinator
     integration: Integration
+
+
+@dataclass(slots=True)
+class VeoliaFetchStats:
+    """Counters and timings of the coordinator updates."""
+
+    updates: int = 0
+    fetch_start: date | None = None
+    fetch_end: date | None = None
+    fetch_seconds: float | None = None
+    compute_seconds: float | None = None
+    invalid_records: int = 0
+    corrected_records: int = 0
+    statistics_since: date | None = None
@@ -0,0 +1,105 @@
+"""Diagnostics support for Veolia."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import date
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PRIMARY_SUBSCRIPTION, DOMAIN
+from .data import VeoliaConfigEntry
+from .external_statistics import external_statistic_id
+from .timeutil import local_midnights
+
+# The subscription id identifies the customer, also inside the statistic id
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_PRIMARY_SUBSCRIPTION,
+    "external_statistic_id",
+}
+
+
+def _cache_info(info) -> dict[str, Any]:
+    """Return lru_cache counters with the hit rate."""
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": round(info.hits / lookups, 3) if lookups else None,
+    }
+
+
+def _jsonable(data: dict) -> dict:
+    """Format dates of a flat dict."""
+    return {k: v.isoformat() if isinstance(v, date) else v for k, v in data.items()}
+
+
+def _meter_diagnostics(coordinator) -> dict[str, Any]:
+    """Return the diagnostics of one subscription."""
+    model = coordinator.data
+    diag: dict[str, Any] = {
+        "primary": coordinator.unique_prefix == coordinator.config_entry.entry_id,
+        "fetch": _jsonable(asdict(coordinator.fetch_stats)),
+        "record_errors": [asdict(error) for error in coordinator.record_errors],
+        "reconciliation": coordinator.reconciliation.as_dict(),
+        "response_cache": coordinator.client_api.cache.stats(),
+        "history": {
+            "daily_rows": len(coordinator.daily_records),
+            "monthly_rows": len(coordinator.monthly_records),
+            "archived": coordinator.history_base.as_dict(),
+        },
+        "pending_alert_changes": [change.as_dict() for change in coordinator.alert_log],
+    }
+    if model is None:
+        return diag
+
+    comp = model.computed
+    diag["model"] = {
+        **comp.summary.as_dict(),
+        "series_lengths": {
+            "daily_stats": len(comp.daily_stats_liters),
+            "hourly_stats": len(comp.hourly_stats_liters),
+            "monthly_stats": len(comp.monthly_stats_cubic_meters),
+            "index_stats": len(comp.index_stats_m3),
+            "daily_cost_stats": len(comp.daily_cost_stats),
+            "monthly_cost_stats": len(comp.monthly_cost_stats),
+        },
+        "last_date": comp.last_date.isoformat() if comp.last_date else None,
+        "last_index_m3": comp.last_index_m3,
+        "external_statistic_id": (
+            external_statistic_id(model.raw.id_abonnement)
+            if model.raw.id_abonnement
+            else None
+        ),
+        "anomalies": model.anomalies.active() if model.anomalies else None,
+        "forecast": _jsonable(asdict(model.forecast)) if model.forecast else None,
+    }
+    settings = model.raw.alert_settings
+    diag["alert_settings"] = asdict(settings) if settings else None
+    return diag
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: VeoliaConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    account = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "account": {"meters": len(account.meters), "logins": account.logins},
+        "caches": {"day_boundaries": _cache_info(local_midnights.cache_info())},
+        # Listed by position, the subscription ids are redacted
+        "meters": [
+            async_redact_data(_meter_diagnostics(coordinator), TO_REDACT)
+            for coordinator in account.coordinators.values()
+        ],
+    }
@@ -1,29 +1,108 @@
 """VeoliaEntity class."""
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, NAME
+from .const import DOMAIN, LOGGER, NAME, SIGNAL_STATISTICS
+from .model import VeoliaModel
+from .records import alert_settings_key
+
+
+@dataclass(frozen=True, kw_only=True)
+class VeoliaDescriptionMixin:
+    """Callables evaluated against the model of a subscription."""
+
+    value_fn: Callable[[VeoliaModel], Any]
+    available_fn: Callable[[VeoliaModel], bool] | None = None
+    attributes_fn: Callable[[VeoliaModel], dict] | None = None
+    icon_fn: Callable[[Any], str] | None = None
+    slice_fn: Callable[[VeoliaModel], Any] | None = None
+
 
+def alert_settings_slice(model: VeoliaModel) -> tuple | None:
+    """Return the alert settings slice of the model."""
+    return alert_settings_key(model.alert_settings)
 
-class VeoliaMesurements(CoordinatorEntity, SensorEntity):
-    """Representation of a Veolia entity."""
 
-    def __init__(self, coordinator, config_entry) -> None:
+class VeoliaEntity(CoordinatorEntity):
+    """Veolia entity of a subscription, evaluated once per update."""
+
+    _attr_has_entity_name = True
+    entity_description: EntityDescription
+
+    def __init__(self, coordinator, config_entry, description) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
         self.config_entry = config_entry
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.unique_prefix}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.unique_prefix)},
+            manufacturer=NAME,
+            name=f"{NAME} {coordinator.meter.subscription_id}",
+        )
+        self._value: Any = None
+        self._model_available = True
+        self._slice: Any = None
+        self._last_success: bool | None = None
+        self._update_from_model()
 
     @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
+    def available(self) -> bool:
+        """Return true if the update succeeded and the value applies."""
+        return super().available and self._model_available
 
-    @property
-    def device_class(self) -> str:
-        """Return the device_class of the sensor."""
-        return SensorDeviceClass.WATER
+    def _update_from_model(self) -> bool:
+        """Evaluate the description, return False if its data slice is unchanged."""
+        model = self.coordinator.data
+        if model is None:
+            return True
+        desc = self.entity_description
+        success = self.coordinator.last_update_success
+        if desc.slice_fn is not None:
+            data_slice = desc.slice_fn(model)
+            if data_slice == self._slice and success == self._last_success:
+                return False
+            self._slice = data_slice
+        self._last_success = success
+        self._value = desc.value_fn(model)
+        self._model_available = desc.available_fn is None or desc.available_fn(model)
+        if desc.attributes_fn is not None:
+            self._attr_extra_state_attributes = desc.attributes_fn(model)
+        if desc.icon_fn is not None:
+            self._attr_icon = desc.icon_fn(self._value)
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Recompute the cached state and write it if it may have changed."""
+        if self._update_from_model():
+            super()._handle_coordinator_update()
+
+    @callback
+    def async_listen_statistics(self, target) -> None:
+        """Call target when the coordinator rewrote the statistics history."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_STATISTICS.format(self.coordinator.unique_prefix),
+                target,
+            )
+        )
+
+    async def _async_save_alert_settings(self, value: Any) -> None:
+        """Send the alert settings edited by the description to Veolia."""
+        LOGGER.debug("Saving alert settings from %s: %s", self.entity_id, value)
+        set_fn = self.entity_description.set_fn
+        await self.coordinator.async_set_alert_settings(
+            lambda settings: set_fn(settings, value)
+        )
@@ -0,0 +1,93 @@
+"""Events computed from the daily readings added by an update."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import date
+from operator import attrgetter
+from typing import Any
+
+from .const import EVENT_MONTH_CLOSED, EVENT_NEW_READING, EVENT_THRESHOLD_CROSSED
+from .records import DailyRecord
+
+
+def _month(day: date) -> str:
+    """Format the month of a day."""
+    return f"{day.year}-{day.month:02d}"
+
+
+def _month_to_date(records: list[DailyRecord], end: int) -> int:
+    """Return the liters of the month of records[end - 1] up to that record."""
+    if not end:
+        return 0
+    last = records[end - 1].day
+    total = 0
+    for i in range(end - 1, -1, -1):
+        day = records[i].day
+        if (day.year, day.month) != (last.year, last.month):
+            break
+        total += records[i].liters
+    return total
+
+
+def reading_events(
+    records: list[DailyRecord], last_day: date, settings: Any
+) -> list[tuple[str, dict]]:
+    """Return the events of the sorted records newer than last_day."""
+    start = bisect_right(records, last_day, key=attrgetter("day"))
+    daily_limit = monthly_limit = None
+    if settings is not None:
+        if settings.daily_enabled and settings.daily_threshold:
+            daily_limit = settings.daily_threshold
+        if settings.monthly_enabled and settings.monthly_threshold:
+            monthly_limit = settings.monthly_threshold * 1000
+    events: list[tuple[str, dict]] = []
+    previous = records[start - 1].day if start else last_day
+    month_liters = _month_to_date(records, start)
+    for rec in records[start:]:
+        if (rec.day.year, rec.day.month) != (previous.year, previous.month):
+            events.append(
+                (
+                    EVENT_MONTH_CLOSED,
+                    {"month": _month(previous), "liters": month_liters},
+                )
+            )
+            month_liters = 0
+        previous = rec.day
+        events.append(
+            (
+                EVENT_NEW_READING,
+                {
+                    "day": rec.day.isoformat(),
+                    "liters": rec.liters,
+                    "fiability": rec.fiability,
+                },
+            )
+        )
+        if daily_limit is not None and rec.liters > daily_limit:
+            events.append(
+                (
+                    EVENT_THRESHOLD_CROSSED,
+                    {
+                        "period": "daily",
+                        "day": rec.day.isoformat(),
+                        "liters": rec.liters,
+                        "threshold_liters": daily_limit,
+                    },
+                )
+            )
+        before, month_liters = month_liters, month_liters + rec.liters
+        if monthly_limit is not None and before <= monthly_limit < month_liters:
+            events.append(
+                (
+                    EVENT_THRESHOLD_CROSSED,
+                    {
+                        "period": "monthly",
+                        "day": rec.day.isoformat(),
+                        "month": _month(rec.day),
+                        "liters": month_liters,
+                        "threshold_liters": monthly_limit,
+                    },
+                )
+            )
+    return events
@@ -0,0 +1,119 @@
+"""External water statistic for the Energy dashboard."""
+
+from __future__ import annotations
+
+from datetime import datetime, tzinfo
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import (
+    StatisticMeanType,
+    StatisticMetaData,
+    async_add_external_statistics,
+)
+from homeassistant.const import UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import DOMAIN, LOGGER, NAME, STATISTICS_BATCH_ROWS
+
+
+def external_statistic_id(meter_id: str) -> str:
+    """Return the external statistic id of a meter."""
+    return f"{DOMAIN}:{slugify(meter_id)}_water"
+
+
+def external_index_statistic_id(meter_id: str) -> str:
+    """Return the external index statistic id of a meter."""
+    return f"{DOMAIN}:{slugify(meter_id)}_index"
+
+
+def compact_rows(rows: list[dict], before: datetime, tz: tzinfo) -> list[dict]:
+    """Merge the daily rows starting before a date into one row per month."""
+    compacted: list[dict] = []
+    month = None
+    for i, row in enumerate(rows):
+        if row["start"] >= before:
+            return compacted + rows[i:]
+        local = row["start"].astimezone(tz)
+        if (local.year, local.month) == month:
+            compacted[-1]["state"] += row["state"]
+            compacted[-1]["sum"] = row["sum"]
+            continue
+        month = (local.year, local.month)
+        compacted.append(dict(row))
+    return compacted
+
+
+@callback
+def async_import_external_statistics(
+    hass: HomeAssistant, meter_id: str, rows: list[dict], *, clear: bool = False
+) -> None:
+    """Import sum-only water rows, clearing the previous rows first if asked."""
+    statistic_id = external_statistic_id(meter_id)
+    if clear:
+        LOGGER.debug("Clearing external statistic %s", statistic_id)
+        get_instance(hass).async_clear_statistics([statistic_id])
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        mean_type=StatisticMeanType.NONE,
+        name=f"{NAME} {meter_id}",
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement=UnitOfVolume.LITERS,
+    )
+    _async_add_rows(hass, metadata, rows)
+
+
+@callback
+def async_import_external_index(
+    hass: HomeAssistant, meter_id: str, rows: list[dict]
+) -> None:
+    """Import the reconciled index rows, whose sums are the index itself.
+
+    Kept apart from the index sensor, whose statistics the recorder compiles
+    with sums relative to the start of the tracking.
+    """
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        mean_type=StatisticMeanType.NONE,
+        name=f"{NAME} {meter_id} index",
+        source=DOMAIN,
+        statistic_id=external_index_statistic_id(meter_id),
+        unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+    )
+    _async_add_rows(hass, metadata, rows)
+
+
+@callback
+def _async_add_rows(
+    hass: HomeAssistant, metadata: StatisticMetaData, rows: list[dict]
+) -> None:
+    """Add external statistics rows in bounded batches."""
+    for i in range(0, len(rows), STATISTICS_BATCH_ROWS):
+        async_add_external_statistics(
+            hass, metadata, rows[i : i + STATISTICS_BATCH_ROWS]
+        )
+
+
+async def async_register_energy_source(hass: HomeAssistant, meter_id: str) -> None:
+    """Add the external statistic as a water source of the Energy dashboard."""
+    from homeassistant.components.energy.data import async_get_manager  # noqa: PLC0415
+
+    statistic_id = external_statistic_id(meter_id)
+    manager = await async_get_manager(hass)
+    sources = list((manager.data or {}).get("energy_sources", []))
+    if any(source.get("stat_energy_from") == statistic_id for source in sources):
+        return
+    LOGGER.debug("Adding %s to the Energy dashboard", statistic_id)
+    sources.append(
+        {
+            "type": "water",
+            "stat_energy_from": statistic_id,
+            "stat_cost": None,
+            "entity_energy_price": None,
+            "number_energy_price": None,
+        }
+    )
+    await manager.async_update({"energy_sources": sources})
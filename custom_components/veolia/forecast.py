@@ -0,0 +1,147 @@
+"""Month-end and year-end consumption forecast for Veolia."""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date
+import math
+
+from .const import FORECAST_ALPHA, FORECAST_WARMUP_DAYS, FORECAST_Z_SCORE
+from .records import DailyRecord, MonthlyRecord
+from .series import DailySeries, MonthlyAggregate, iter_new_readings
+
+_FLAT_PROFILE = (1.0,) * 12
+
+
+@dataclass(slots=True)
+class ForecastState:
+    """Projected totals with their confidence band, in m3."""
+
+    reference_day: date
+    daily_rate_liters: float
+    month_end_m3: float
+    month_end_low_m3: float
+    month_end_high_m3: float
+    year_end_m3: float
+    year_end_low_m3: float
+    year_end_high_m3: float
+
+
+def seasonal_profile(
+    monthly: list[MonthlyRecord], before_year: int
+) -> tuple[float, ...]:
+    """Return the relative daily usage of each month over previous years."""
+    sums = [0.0] * 12
+    counts = [0] * 12
+    for rec in monthly:
+        if rec.year >= before_year:
+            continue
+        sums[rec.month - 1] += rec.m3 / monthrange(rec.year, rec.month)[1]
+        counts[rec.month - 1] += 1
+    averages = [s / c for s, c in zip(sums, counts, strict=True) if c]
+    if not averages:
+        return _FLAT_PROFILE
+    overall = sum(averages) / len(averages)
+    if overall <= 0:
+        return _FLAT_PROFILE
+    return tuple(
+        sums[i] / counts[i] / overall if counts[i] and sums[i] > 0 else 1.0
+        for i in range(12)
+    )
+
+
+class VeoliaForecaster:
+    """Forecaster updated with each new daily reading."""
+
+    __slots__ = ("_last_day", "_profile", "_profile_key", "_rate", "_samples", "_var")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._last_day: date | None = None
+        self._samples = 0
+        self._rate = 0.0
+        self._var = 0.0
+        self._profile: tuple[float, ...] = _FLAT_PROFILE
+        self._profile_key: tuple[int, int] | None = None
+
+    def feed(self, day: date, liters: int) -> None:
+        """Update the daily rate with a new reading."""
+        if self._last_day is not None and day <= self._last_day:
+            return
+        if self._samples == 0:
+            self._rate = float(liters)
+        delta = liters - self._rate
+        self._rate += FORECAST_ALPHA * delta
+        self._var = (1 - FORECAST_ALPHA) * (self._var + FORECAST_ALPHA * delta * delta)
+        self._samples += 1
+        self._last_day = day
+
+    def update(self, daily: list[DailyRecord], monthly: list[MonthlyRecord]) -> None:
+        """Feed new daily readings and refresh the seasonal profile if needed."""
+        for day, liters in iter_new_readings(daily, self._last_day):
+            self.feed(day, liters)
+        if self._last_day is None:
+            return
+        # Past years only change when a backfill adds records
+        year = self._last_day.year
+        key = (year, sum(1 for rec in monthly if rec.year < year))
+        if key != self._profile_key:
+            self._profile = seasonal_profile(monthly, year)
+            self._profile_key = key
+
+    def state(
+        self, series: DailySeries, aggregate: MonthlyAggregate
+    ) -> ForecastState | None:
+        """Project month-end and year-end totals from the last reading."""
+        ref = self._last_day
+        if ref is None or self._samples < FORECAST_WARMUP_DAYS:
+            return None
+        month_days = monthrange(ref.year, ref.month)[1]
+        month_start = ref.replace(day=1)
+        month_to_date = series.sum_between(month_start, ref)
+        if month_to_date is None:
+            # History starts within the month, extrapolate the missing days
+            first = series.start or ref
+            month_to_date = (series.sum_between(first, ref) or 0) + (
+                first - month_start
+            ).days * self._rate
+        remaining = month_days - ref.day
+        month_end = month_to_date + remaining * self._rate
+        # Day to day noise plus the uncertainty of the estimated rate itself
+        rate_var = self._var * FORECAST_ALPHA / (2 - FORECAST_ALPHA)
+        month_var = remaining * self._var + remaining * remaining * rate_var
+
+        closed_months = sum(
+            aggregate.monthly_m3.get((ref.year, month), 0)
+            for month in range(1, ref.month)
+        )
+        current = self._profile[ref.month - 1]
+        consumed = closed_months * 1000 + month_to_date
+        weighted_days = float(remaining)
+        noise_var = remaining * self._var
+        for month in range(ref.month + 1, 13):
+            ratio = self._profile[month - 1] / current
+            days = monthrange(ref.year, month)[1]
+            weighted_days += days * ratio
+            noise_var += days * self._var * ratio * ratio
+        year_end = consumed + weighted_days * self._rate
+        year_var = noise_var + weighted_days * weighted_days * rate_var
+
+        month_band = FORECAST_Z_SCORE * math.sqrt(month_var)
+        year_band = FORECAST_Z_SCORE * math.sqrt(year_var)
+        return ForecastState(
+            reference_day=ref,
+            daily_rate_liters=round(self._rate, 1),
+            month_end_m3=_m3(month_end),
+            month_end_low_m3=_m3(max(month_to_date, month_end - month_band)),
+            month_end_high_m3=_m3(month_end + month_band),
+            year_end_m3=_m3(year_end),
+            year_end_low_m3=_m3(max(consumed, year_end - year_band)),
+            year_end_high_m3=_m3(year_end + year_band),
+        )
+
+
+def _m3(liters: float) -> float:
+    """Convert liters to m3."""
+    return round(liters / 1000, 3)
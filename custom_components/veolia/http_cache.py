@@ -0,0 +1,116 @@
+"""Cache of the consumption responses of the Veolia portal."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .const import CONSO_FIABILITY, IDX_FIABILITY
+from .records import is_estimated
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """Body of a consumption response."""
+
+    body: list[dict[str, Any]]
+    fetched: float
+    immutable: bool = False
+
+
+def cache_key(endpoint: str, year: int, month: int | None = None) -> str:
+    """Return the key of an endpoint and period."""
+    return f"{endpoint}/{year}" if month is None else f"{endpoint}/{year}-{month:02d}"
+
+
+def _period_end(key: str) -> date:
+    """Return the day following the period of a key."""
+    year, _, month = key.rpartition("/")[2].partition("-")
+    if not month:
+        return date(int(year) + 1, 1, 1)
+    return date(int(year) + int(month) // 12, int(month) % 12 + 1, 1)
+
+
+def is_settled(
+    body: list[dict[str, Any]],
+    year: int,
+    month: int | None,
+    today: date,
+    settle_days: int,
+) -> bool:
+    """Return True when a closed period can no longer change."""
+    if not body:
+        return False
+    if month is None:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year + month // 12, month % 12 + 1, 1)
+    if today < end + timedelta(days=settle_days):
+        return False
+    # Estimated readings are replaced by measured ones later on
+    return not any(
+        is_estimated(row.get(IDX_FIABILITY)) or is_estimated(row.get(CONSO_FIABILITY))
+        for row in body
+        if isinstance(row, dict)
+    )
+
+
+class ResponseCache:
+    """Responses kept until their TTL, or forever once their period settled."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._entries: dict[str, CachedResponse] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, now: float) -> CachedResponse | None:
+        """Return the entry of key if still fresh, counting hits and misses."""
+        entry = self._entries.get(key)
+        if entry is not None and (entry.immutable or now - entry.fetched < self.ttl):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        """Store the entry of key."""
+        self._entries[key] = entry
+
+    def discard(self, key: str) -> None:
+        """Drop the entry of key so that it is fetched again."""
+        self._entries.pop(key, None)
+
+    def prune(self, start: date) -> None:
+        """Drop the entries of the periods ended before start, never fetched again."""
+        self._entries = {
+            k: e for k, e in self._entries.items() if _period_end(k) > start
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the settled entries, the others are refetched after a restart."""
+        return {
+            key: {"body": entry.body, "fetched": entry.fetched}
+            for key, entry in self._entries.items()
+            if entry.immutable
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Add the settled entries of as_dict output."""
+        for key, entry in data.items():
+            self._entries.setdefault(
+                key, CachedResponse(entry["body"], entry["fetched"], immutable=True)
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Return the hit and miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "settled": sum(entry.immutable for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
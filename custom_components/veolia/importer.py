@@ -0,0 +1,183 @@
+"""Import of Veolia consumption history files."""
+
+from __future__ import annotations
+
+from collections.abc import Container, Iterator
+import csv
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from itertools import pairwise
+from pathlib import Path
+import unicodedata
+
+from .const import LOGGER
+from .records import DailyRecord
+
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y")
+# Liters per unit of the index column
+_INDEX_LITERS = {"m3": 1000, "L": 1}
+
+
+@dataclass(slots=True)
+class ImportResult:
+    """Outcome of a history file import."""
+
+    rows: int = 0
+    duplicates: int = 0
+    errors: int = 0
+    index_unit: str | None = None
+
+
+def _normalize(header: str) -> str:
+    """Lower a header and strip its accents."""
+    text = unicodedata.normalize("NFKD", header).encode("ascii", "ignore")
+    return text.decode().strip().lower()
+
+
+def _columns(header: list[str]) -> dict[str, int]:
+    """Locate the known columns of an export header."""
+    columns: dict[str, int] = {}
+    for i, raw in enumerate(header):
+        name = _normalize(raw)
+        if "date" in name:
+            columns.setdefault("date", i)
+        elif "fiab" in name or "type" in name or "certifi" in name:
+            columns.setdefault("fiability", i)
+        elif "index" in name:
+            if not {"index", "index_liters"} & columns.keys():
+                columns["index_liters" if _in_liters(name) else "index"] = i
+        elif "conso" in name:
+            columns.setdefault("liters" if _in_liters(name) else "m3", i)
+    if "date" not in columns or not {"liters", "m3"} & columns.keys():
+        raise ValueError(f"Unrecognized header: {header}")
+    return columns
+
+
+def _in_liters(name: str) -> bool:
+    """Return True if a normalized header declares liters."""
+    return "litre" in name or "(l)" in name
+
+
+def _number(text: str) -> float | None:
+    """Parse a number written with a decimal comma or point."""
+    text = text.replace("\xa0", "").replace(" ", "").replace(",", ".")
+    return float(text) if text else None
+
+
+def _day(text: str) -> date:
+    """Parse the day of a reading, ignoring any time part."""
+    text = text.strip().split(" ")[0].split("T")[0]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {text}")
+
+
+def _record(row: list[str], columns: dict[str, int]) -> DailyRecord:
+    """Map a CSV row onto a daily record."""
+    day = _day(row[columns["date"]])
+    if "liters" in columns:
+        liters = _number(row[columns["liters"]])
+    else:
+        m3 = _number(row[columns["m3"]])
+        liters = None if m3 is None else m3 * 1000
+    if liters is None:
+        raise ValueError("Missing consumption")
+    column = columns.get("index", columns.get("index_liters"))
+    # In the unit of the file until read_history_file checked it
+    index = _number(row[column]) if column is not None else None
+    fiability = row[columns["fiability"]].strip() if "fiability" in columns else ""
+    return DailyRecord(
+        day=day,
+        liters=round(liters),
+        m3=round(liters / 1000, 3),
+        index_m3=index,
+        fiability=fiability or None,
+    )
+
+
+def iter_history_file(path: Path, result: ImportResult) -> Iterator[DailyRecord]:
+    """Stream the daily records of a Veolia CSV export."""
+    with path.open(newline="", encoding="utf-8-sig", errors="replace") as file:
+        first = file.readline()
+        try:
+            dialect = csv.Sniffer().sniff(first, delimiters=";,\t")
+        except csv.Error as err:
+            raise ValueError(f"Unrecognized header: {first!r}") from err
+        columns = _columns(next(csv.reader([first], dialect)))
+        if "index" in columns:
+            result.index_unit = "m3"
+        elif "index_liters" in columns:
+            result.index_unit = "L"
+        for line, row in enumerate(csv.reader(file, dialect), start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            result.rows += 1
+            try:
+                yield _record(row, columns)
+            except (IndexError, ValueError) as err:
+                result.errors += 1
+                LOGGER.debug("Skipping line %s of %s: %s", line, path, err)
+
+
+def _index_unit(records: list[DailyRecord], declared: str) -> str | None:
+    """Return the unit of the indexes, None if they match no unit.
+
+    The index increase over consecutive days is compared to the consumption,
+    the declared unit is kept when there is nothing to compare.
+    """
+    increase = liters = 0.0
+    for prev, rec in pairwise(records):
+        if (
+            (rec.day - prev.day).days == 1
+            and prev.index_m3 is not None
+            and rec.index_m3 is not None
+            and rec.index_m3 >= prev.index_m3
+        ):
+            increase += rec.index_m3 - prev.index_m3
+            liters += rec.liters
+    if not liters:
+        return declared
+    for unit in sorted(_INDEX_LITERS, key=lambda unit: unit != declared):
+        if 0.5 <= increase * _INDEX_LITERS[unit] / liters <= 2:
+            return unit
+    return None
+
+
+def read_history_file(
+    path: Path, known: Container[date]
+) -> tuple[list[DailyRecord], ImportResult]:
+    """Return the records of a file missing from the known days."""
+    result = ImportResult()
+    records: dict[date, DailyRecord] = {}
+    for rec in iter_history_file(path, result):
+        if rec.day in known or rec.day in records:
+            result.duplicates += 1
+            continue
+        records[rec.day] = rec
+    rows = [records[k] for k in sorted(records)]
+    if result.index_unit is None:
+        return rows, result
+    unit = _index_unit(rows, result.index_unit)
+    if unit != result.index_unit:
+        LOGGER.warning(
+            "Indexes of %s declared in %s, found in %s",
+            path,
+            result.index_unit,
+            unit or "no known unit",
+        )
+        result.index_unit = unit
+    if unit is None:
+        return [replace(rec, index_m3=None) for rec in rows], result
+    if unit != "m3":
+        rows = [
+            (
+                replace(rec, index_m3=round(rec.index_m3 / 1000, 3))
+                if rec.index_m3 is not None
+                else rec
+            )
+            for rec in rows
+        ]
+    return rows, result
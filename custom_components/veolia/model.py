@@ -2,48 +2,189 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from dataclasses import dataclass
-from datetime import date, datetime, timedelta, timezone
+from calendar import monthrange
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta, tzinfo
 from typing import Any
 
-from .const import (
-    CONSO,
-    CONSO_FIABILITY,
-    CUBIC_METER,
-    DATA_DATE,
-    IDX,
-    IDX_FIABILITY,
-    LITRE,
-    LOGGER,
-    MONTH,
-    YEAR,
-)
-
-
-def _safe_last(seq: Iterable[Any]) -> Any | None:
-    """Get last data."""
-    try:
-        s = list(seq) if not isinstance(seq, list) else seq
-        return s[-1] if s else None
-    except Exception:
-        return None
+from .anomaly import AnomalyState
+from .const import CONSO, DATA_DATETIME, LITRE
+from .forecast import ForecastState
+from .reconcile import IndexState, reconcile
+from .records import DailyRecord, MonthlyRecord
+from .series import DailySeries, MonthlyAggregate, SeriesSummary
+from .tariff import TariffSchedule
+from .timeutil import day_start, hour_start
 
 
-def _parse_date(s: str) -> date | None:
-    """Parse date."""
+def _parse_datetime(s: str) -> datetime | None:
+    """Parse sub-daily reading timestamp."""
     try:
-        return datetime.strptime(s, "%Y-%m-%d").date()
+        return datetime.fromisoformat(s)
     except Exception:
         return None
 
 
-def _find_last_for_date(records: list[dict], d: date) -> dict | None:
-    """Find last available data for date."""
-    for rec in reversed(records or []):
-        if _parse_date(rec.get(DATA_DATE, "")) == d:
-            return rec
-    return None
+def iter_hourly_readings(
+    records: Iterable[dict], tz: tzinfo
+) -> Iterator[tuple[datetime, int]]:
+    """Yield the naive local hour and liters of each sub-daily reading."""
+    for rec in records:
+        ts = _parse_datetime(rec.get(DATA_DATETIME) or "")
+        if ts is None:
+            continue
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(tz).replace(tzinfo=None)
+        yield (
+            ts.replace(minute=0, second=0, microsecond=0),
+            int((rec.get(CONSO) or {}).get(LITRE) or 0),
+        )
+
+
+def hourly_by_day(
+    records: Iterable[dict], tz: tzinfo
+) -> dict[date, dict[datetime, int]]:
+    """Add up sub-daily readings per local day and hour, in any order."""
+    by_day: dict[date, dict[datetime, int]] = {}
+    for hour, liters in iter_hourly_readings(records, tz):
+        hours = by_day.setdefault(hour.date(), {})
+        hours[hour] = hours.get(hour, 0) + liters
+    return by_day
+
+
+def _fit_hours(
+    hours: list[tuple[datetime, int]], total: int
+) -> list[tuple[datetime, int]]:
+    """Return the hours of a day adjusted to add up to its daily total."""
+    remainder = total - sum(liters for _, liters in hours)
+    if remainder > 0:
+        # Liters of the day not covered by sub-daily readings
+        last = hours[-1][0]
+        if last.hour < 23:
+            return [*hours, (last + timedelta(hours=1), remainder)]
+        return [*hours[:-1], (last, hours[-1][1] + remainder)]
+    if remainder < 0:
+        # Daily total corrected downwards, trim the latest hours but keep
+        # every hour so that the rows imported before are all overwritten
+        trimmed = []
+        excess = -remainder
+        for hour, liters in reversed(hours):
+            cut = min(liters, excess)
+            excess -= cut
+            trimmed.append((hour, liters - cut))
+        return trimmed[::-1]
+    return hours
+
+
+def _hourly_stats(
+    days: list[date],
+    daily_rows: list[dict],
+    hourly: Mapping[date, Mapping[datetime, int]],
+    tz: tzinfo,
+    cumul_liters: int = 0,
+) -> list[dict]:
+    """Build hourly rows adding up to the daily totals, daily rows without hours."""
+    stats: list[dict] = []
+    for d, row in zip(days, daily_rows, strict=True):
+        if not (day_hours := hourly.get(d)):
+            cumul_liters += row["state"]
+            stats.append({**row, "sum": cumul_liters})
+            continue
+        for hour, liters in _fit_hours(sorted(day_hours.items()), row["state"]):
+            cumul_liters += liters
+            start = hour_start(hour, tz)
+            if stats and stats[-1]["start"] == start:
+                # Non-existent local hour on DST spring-forward
+                stats[-1]["state"] += liters
+                stats[-1]["sum"] = cumul_liters
+                continue
+            stats.append({"start": start, "state": liters, "sum": cumul_liters})
+    return stats
+
+
+def _cost_stats(
+    tariff: TariffSchedule,
+    periods: list[date],
+    rows: list[dict],
+    *,
+    monthly: bool,
+    cumul_cost: float = 0.0,
+) -> list[dict]:
+    """Price volume rows, the cost sum runs alongside the volume sum."""
+    cost_stats: list[dict] = []
+    for first, row in zip(periods, rows, strict=True):
+        if monthly:
+            days = monthrange(first.year, first.month)[1]
+            cost = tariff.cost(first, row["state"], days)
+        else:
+            cost = tariff.cost(first, row["state"] / 1000)
+        cumul_cost += cost
+        cost_stats.append(
+            {"start": row["start"], "state": cost, "sum": round(cumul_cost, 4)}
+        )
+    return cost_stats
+
+
+@dataclass(slots=True)
+class HistoryBase:
+    """Statistics sums of the history archived out of memory."""
+
+    liters: int = 0
+    m3: float = 0.0
+    daily_cost: float = 0.0
+    monthly_cost: float = 0.0
+    daily_since: date | None = None
+    monthly_since: date | None = None
+    index: IndexState = field(default_factory=IndexState)
+
+    @property
+    def archived(self) -> bool:
+        """Return True when older rows were archived."""
+        return self.daily_since is not None or self.monthly_since is not None
+
+    def covers(self, day: date | None) -> bool:
+        """Return True when the rows from day onwards are all in memory."""
+        if day is None:
+            return not self.archived
+        return all(
+            since is None or day >= since
+            for since in (self.daily_since, self.monthly_since)
+        )
+
+    def as_dict(self) -> dict:
+        """Return a JSON serializable dict."""
+        return {
+            "liters": self.liters,
+            "m3": self.m3,
+            "daily_cost": self.daily_cost,
+            "monthly_cost": self.monthly_cost,
+            "daily_since": _iso(self.daily_since),
+            "monthly_since": _iso(self.monthly_since),
+            "index": asdict(self.index),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HistoryBase:
+        """Build a base from as_dict output."""
+        return cls(
+            **{
+                **data,
+                "daily_since": _date(data.get("daily_since")),
+                "monthly_since": _date(data.get("monthly_since")),
+                "index": IndexState(**data.get("index", {})),
+            }
+        )
+
+
+def _iso(d: date | None) -> str | None:
+    """Format an optional date."""
+    return d.isoformat() if d else None
+
+
+def _date(s: str | None) -> date | None:
+    """Parse an optional date."""
+    return date.fromisoformat(s) if s else None
 
 
 @dataclass(slots=True)
@@ -61,6 +202,15 @@ class VeoliaComputed:
     daily_stats_liters: list[dict]
     monthly_stats_cubic_meters: list[dict]
     index_stats_m3: list[dict]
+    hourly_stats_liters: list[dict]
+    daily_series: DailySeries
+    summary: SeriesSummary
+    monthly_aggregate: MonthlyAggregate
+    daily_cost_stats: list[dict]
+    monthly_cost_stats: list[dict]
+    last_daily_cost: float | None
+    last_monthly_cost: float | None
+    annual_cost: float | None
     daily_today_liters: int | None
     daily_today_m3: float | None
     daily_today_fiability: str | None
@@ -72,185 +222,235 @@ class VeoliaModel:
 
     raw: Any  # VeoliaAccountData
     computed: VeoliaComputed
+    anomalies: AnomalyState | None = None
+    forecast: ForecastState | None = None
 
     def __getattr__(self, name: str):
         """GetAttr for Switch and BinarySensor."""
         return getattr(self.raw, name)
 
     @staticmethod
-    def from_account_data(raw: Any, *, today: date | None = None) -> VeoliaModel:
-        """Read data and populate VeoliaComputed model."""
-        daily = raw.daily_consumption or []
-        monthly = raw.monthly_consumption or []
-        last_daily = _safe_last(daily) or {}
-        last_month = _safe_last(monthly) or {}
-        last_index_m3 = (last_daily.get(IDX) or {}).get(CUBIC_METER) or (
-            last_month.get(IDX) or {}
-        ).get(CUBIC_METER)
-        last_index_m3 = float(last_index_m3) if last_index_m3 is not None else None
-        last_daily_liters = (last_daily.get(CONSO) or {}).get(LITRE)
-        last_daily_liters = (
-            int(last_daily_liters) if last_daily_liters is not None else None
-        )
-        last_daily_m3 = (last_daily.get(CONSO) or {}).get(CUBIC_METER)
-        last_daily_m3 = float(last_daily_m3) if last_daily_m3 is not None else None
-        monthly_latest_m3 = (last_month.get(CONSO) or {}).get(CUBIC_METER)
-        monthly_latest_m3 = (
-            float(monthly_latest_m3) if monthly_latest_m3 is not None else None
-        )
+    def from_account_data(
+        raw: Any,
+        daily: list[DailyRecord],
+        monthly: list[MonthlyRecord],
+        *,
+        today: date | None = None,
+        tz: tzinfo = UTC,
+        tariff: TariffSchedule | None = None,
+        forward_fill: bool = True,
+        index_stats: bool = True,
+        index_points: list[tuple[date, float]] | None = None,
+        base: HistoryBase | None = None,
+        hourly: Mapping[date, Mapping[datetime, int]] | None = None,
+    ) -> VeoliaModel:
+        """Compute the model from sorted, validated records."""
+        if hourly is None:
+            hourly = hourly_by_day(getattr(raw, "hourly_consumption", None) or [], tz)
+        last_daily = daily[-1] if daily else None
+        last_month = monthly[-1] if monthly else None
+        if today is None:
+            today = datetime.now(tz).date()
+        rec_today = last_daily if last_daily and last_daily.day == today else None
+        if base is None:
+            base = HistoryBase()
 
-        try:
-            current_year = datetime.now().year
-            annual_total_m3 = float(
-                sum(
-                    float((m.get(CONSO) or {}).get(CUBIC_METER) or 0.0)
-                    for m in monthly
-                    if m.get(YEAR) == current_year
-                )
+        # Recorder data, the sums continue those of the archived rows
+        cumul_liters = base.liters
+        daily_days: list[date] = []
+        daily_stats_liters: list[dict] = []
+        daily_series = DailySeries()
+        summary = SeriesSummary()
+        for rec in daily:
+            cumul_liters += rec.liters
+            daily_days.append(rec.day)
+            daily_series.append(rec.day, rec.liters)
+            summary.add_daily(rec.day, rec.fiability)
+            daily_stats_liters.append(
+                {
+                    "start": day_start(rec.day, tz),
+                    "state": rec.liters,
+                    "sum": cumul_liters,
+                }
             )
-        except Exception:
-            annual_total_m3 = None
+        hourly_stats_liters = (
+            _hourly_stats(daily_days, daily_stats_liters, hourly, tz, base.liters)
+            if hourly
+            else []
+        )
 
-        d_last = (last_daily or {}).get(DATA_DATE)
-        last_date = _parse_date(d_last) if d_last else None
-        daily_fiability = (last_daily or {}).get(IDX_FIABILITY)
-        monthly_fiability = (last_month or {}).get(CONSO_FIABILITY)
-        if today is None:
-            today = datetime.now().date()
-        rec_today = _find_last_for_date(daily, today)
-        if rec_today:
-            _c = rec_today.get(CONSO) or {}
-            daily_today_liters = int(_c.get(LITRE) or 0)
-            daily_today_m3 = float(_c.get(CUBIC_METER) or 0.0)
-            daily_today_fiability = rec_today.get(IDX_FIABILITY)
-        else:
-            daily_today_liters = None
-            daily_today_m3 = None
-            daily_today_fiability = None
-        # Recorder data
-        daily_stats_liters: list[dict] = []
+        cumul_cubic_meter = base.m3
+        monthly_firsts: list[date] = []
         monthly_stats_cubic_meters: list[dict] = []
-        index_stats_m3: list[dict] = []
-        try:
-            # Statistics for Daily
-            cumul_liters = 0
-            for rec in daily:
-                date_str = rec.get(DATA_DATE)
-                if not date_str:
-                    continue
-                d = datetime.strptime(date_str, "%Y-%m-%d")
-                start = datetime(d.year, d.month, d.day, 0, 0, 0, tzinfo=timezone.utc)
-                liters = int((rec.get(CONSO) or {}).get(LITRE) or 0)
-                cumul_liters += liters
-                daily_stats_liters.append(
-                    {"start": start, "state": liters, "sum": cumul_liters}
-                )
-            # Statistics for Monthly
-            cumul_cubic_meter = 0
-            for rec in monthly:
-                year = rec.get(YEAR)
-                month = rec.get(MONTH)
-                if not year or not month:
-                    continue
-                date_str = f"{year}-{month}-{1}"
-                d = datetime.strptime(date_str, "%Y-%m-%d")
-                start = datetime(d.year, d.month, d.day, 0, 0, 0, tzinfo=timezone.utc)
-                cubic_meter = float((rec.get(CONSO) or {}).get(CUBIC_METER) or 0)
-                cumul_cubic_meter += cubic_meter
-                monthly_stats_cubic_meters.append(
-                    {"start": start, "state": cubic_meter, "sum": cumul_cubic_meter}
-                )
-            last_state = None
-            last_sum = None
-            last_date = None
-            LOGGER.debug("Computing index_stats_m3 with data = %s", daily)
-            for record in daily:
-                date_str = record.get(DATA_DATE)
-                if not date_str:
-                    continue
-                try:
-                    d = datetime.strptime(date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    continue
-                idx = (record.get(IDX) or {}).get(CUBIC_METER)
-                try:
-                    cur_state = float(idx) if idx is not None else None
-                except (TypeError, ValueError):
-                    continue
-                if cur_state is None:
-                    continue
-                start_dt = datetime(
-                    d.year, d.month, d.day, 0, 0, 0, tzinfo=timezone.utc
-                )
-                cur_sum = cur_state
-                # Forward-fill
-                if last_date is not None:
-                    gap = (d - last_date).days
-                    if gap > 1 and last_state is not None and last_sum is not None:
-                        for i in range(1, gap):
-                            fill_d = last_date + timedelta(days=i)
-                            fill_dt = datetime(
-                                fill_d.year,
-                                fill_d.month,
-                                fill_d.day,
-                                0,
-                                0,
-                                0,
-                                tzinfo=timezone.utc,
-                            )
-                            index_stats_m3.append(
-                                {"start": fill_dt, "state": last_state, "sum": last_sum}
-                            )
-                index_stats_m3.append(
-                    {"start": start_dt, "state": cur_state, "sum": cur_sum}
-                )
-                last_state = cur_state
-                last_sum = cur_sum
-                last_date = d
-            # Forward-fill until today
-            if (
-                last_date is not None
-                and last_state is not None
-                and last_sum is not None
-            ):
-                today = datetime.now(timezone.utc).date()
-                gap = (today - last_date).days
-                if gap >= 1:
-                    for i in range(1, gap + 1):
-                        fill_d = last_date + timedelta(days=i)
-                        fill_dt = datetime(
-                            fill_d.year,
-                            fill_d.month,
-                            fill_d.day,
-                            0,
-                            0,
-                            0,
-                            tzinfo=timezone.utc,
-                        )
-                        index_stats_m3.append(
-                            {"start": fill_dt, "state": last_state, "sum": last_sum}
-                        )
-        except Exception as e:
-            LOGGER.warning(
-                "An exception occur when computing Statistics, details=%s", e
+        aggregate = MonthlyAggregate()
+        for rec in monthly:
+            cumul_cubic_meter += rec.m3
+            monthly_firsts.append(rec.first)
+            summary.add_monthly(rec.first, rec.fiability)
+            aggregate.add(rec.year, rec.month, rec.m3)
+            monthly_stats_cubic_meters.append(
+                {
+                    "start": day_start(rec.first, tz),
+                    "state": rec.m3,
+                    "sum": cumul_cubic_meter,
+                }
+            )
+
+        daily_cost_stats: list[dict] = []
+        monthly_cost_stats: list[dict] = []
+        annual_cost = None
+        if tariff is not None:
+            daily_cost_stats = _cost_stats(
+                tariff,
+                daily_days,
+                daily_stats_liters,
+                monthly=False,
+                cumul_cost=base.daily_cost,
+            )
+            monthly_cost_stats = _cost_stats(
+                tariff,
+                monthly_firsts,
+                monthly_stats_cubic_meters,
+                monthly=True,
+                cumul_cost=base.monthly_cost,
+            )
+            annual_cost = round(
+                sum(
+                    row["state"]
+                    for first, row in zip(
+                        monthly_firsts, monthly_cost_stats, strict=True
+                    )
+                    if first.year == today.year
+                ),
+                2,
             )
-            daily_stats_liters = []
-            monthly_stats_cubic_meters = []
-            index_stats_m3 = []
+
+        if index_points is None:
+            index_points = [
+                (rec.day, rec.index_m3) for rec in daily if rec.index_m3 is not None
+            ]
         comp = VeoliaComputed(
-            last_index_m3=last_index_m3,
-            last_daily_liters=last_daily_liters,
-            last_daily_m3=last_daily_m3,
-            monthly_latest_m3=monthly_latest_m3,
-            annual_total_m3=annual_total_m3,
-            last_date=last_date,
-            daily_fiability=daily_fiability,
-            monthly_fiability=monthly_fiability,
+            last_index_m3=_last_index(daily, monthly, index_points),
+            last_daily_liters=last_daily.liters if last_daily else None,
+            last_daily_m3=last_daily.m3 if last_daily else None,
+            monthly_latest_m3=last_month.m3 if last_month else None,
+            annual_total_m3=aggregate.totals_m3.get(today.year, 0),
+            last_date=last_daily.day if last_daily else None,
+            daily_fiability=last_daily.fiability if last_daily else None,
+            monthly_fiability=last_month.fiability if last_month else None,
             daily_stats_liters=daily_stats_liters,
             monthly_stats_cubic_meters=monthly_stats_cubic_meters,
-            index_stats_m3=index_stats_m3,
-            daily_today_liters=daily_today_liters,
-            daily_today_m3=daily_today_m3,
-            daily_today_fiability=daily_today_fiability,
+            index_stats_m3=(
+                _index_stats(index_points, today, tz, forward_fill)
+                if index_stats
+                else []
+            ),
+            hourly_stats_liters=hourly_stats_liters,
+            daily_series=daily_series,
+            summary=summary,
+            monthly_aggregate=aggregate,
+            daily_cost_stats=daily_cost_stats,
+            monthly_cost_stats=monthly_cost_stats,
+            last_daily_cost=daily_cost_stats[-1]["state"] if daily_cost_stats else None,
+            last_monthly_cost=(
+                monthly_cost_stats[-1]["state"] if monthly_cost_stats else None
+            ),
+            annual_cost=annual_cost,
+            daily_today_liters=rec_today.liters if rec_today else None,
+            daily_today_m3=rec_today.m3 if rec_today else None,
+            daily_today_fiability=rec_today.fiability if rec_today else None,
         )
         return VeoliaModel(raw=raw, computed=comp)
+
+
+def _last_index(
+    daily: list[DailyRecord],
+    monthly: list[MonthlyRecord],
+    index_points: list[tuple[date, float]],
+) -> float | None:
+    """Return the most recent reconciled index, the monthly one only if newer."""
+    last_month = next(
+        (rec for rec in reversed(monthly) if rec.index_m3 is not None), None
+    )
+    if not index_points:
+        return last_month.index_m3 if last_month else None
+    last_day, last_index_m3 = index_points[-1]
+    if last_month is None or last_month.first <= last_day:
+        return last_index_m3
+    # Carry the rollover and replacement offset onto the monthly index
+    raw = next(
+        (
+            rec.index_m3
+            for rec in reversed(daily)
+            if rec.day == last_day and rec.index_m3 is not None
+        ),
+        last_index_m3,
+    )
+    return max(last_index_m3, round(last_month.index_m3 + last_index_m3 - raw, 3))
+
+
+def _index_stats(
+    points: list[tuple[date, float]], today: date, tz: tzinfo, forward_fill: bool
+) -> list[dict]:
+    """Build the index statistics, filling the days without reading."""
+    index_stats_m3: list[dict] = []
+    prev_date: date | None = None
+    last_state = 0.0
+    for day, index_m3 in points:
+        if forward_fill and prev_date is not None:
+            index_stats_m3.extend(
+                _index_fill(prev_date, (day - prev_date).days - 1, last_state, tz)
+            )
+        index_stats_m3.append(
+            {"start": day_start(day, tz), "state": index_m3, "sum": index_m3}
+        )
+        last_state = index_m3
+        prev_date = day
+    # Forward-fill until today
+    if forward_fill and prev_date is not None:
+        index_stats_m3.extend(
+            _index_fill(prev_date, (today - prev_date).days, last_state, tz)
+        )
+    return index_stats_m3
+
+
+def _index_fill(
+    prev_date: date, days: int, index_m3: float, tz: tzinfo
+) -> Iterator[dict]:
+    """Repeat the last index over the days following prev_date."""
+    for i in range(1, days + 1):
+        yield {
+            "start": day_start(prev_date + timedelta(days=i), tz),
+            "state": index_m3,
+            "sum": index_m3,
+        }
+
+
+def iter_archived_stats(archive: dict, series: str, tz: tzinfo) -> Iterator[dict]:
+    """Yield the statistics rows of the archived history, sums from zero.
+
+    Clamped and reconciled like the history in memory, so that the sums end
+    on those of HistoryBase.
+    """
+    if series == "index":
+        daily = [DailyRecord.from_dict(row) for row in archive.get("daily", [])]
+        for day, index_m3 in reconcile(daily, []).index_points:
+            yield {"start": day_start(day, tz), "state": index_m3, "sum": index_m3}
+        return
+    cumul = 0
+    if series == "daily":
+        for rec in map(DailyRecord.from_dict, archive.get("daily", [])):
+            cumul += max(rec.liters, 0)
+            yield {
+                "start": day_start(rec.day, tz),
+                "state": max(rec.liters, 0),
+                "sum": cumul,
+            }
+    elif series == "monthly":
+        for rec in map(MonthlyRecord.from_dict, archive.get("monthly", [])):
+            cumul += max(rec.m3, 0.0)
+            yield {
+                "start": day_start(rec.first, tz),
+                "state": max(rec.m3, 0.0),
+                "sum": cumul,
+            }
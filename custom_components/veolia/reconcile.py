@@ -0,0 +1,164 @@
+"""Reconciliation of the meter index with the daily and monthly series."""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass, field, replace
+from datetime import date
+
+from .const import (
+    INDEX_JITTER_M3,
+    INDEX_REGISTER_SIZES_M3,
+    MONTH_MISMATCH_M3,
+    MONTH_MISMATCH_RATIO,
+)
+from .records import DailyRecord, MonthlyRecord
+
+ROLLOVER = "rollover"
+REPLACEMENT = "replacement"
+
+
+@dataclass(slots=True, frozen=True)
+class MeterEvent:
+    """Meter rollover or replacement detected from an index drop."""
+
+    day: date
+    kind: str
+    previous_m3: float
+    index_m3: float
+
+
+@dataclass(slots=True)
+class IndexState:
+    """Running state of the monotonic index, carried across archived rows."""
+
+    offset: float = 0.0
+    previous: float | None = None
+    continuous: float = 0.0
+    consumed: int = 0
+
+
+@dataclass(slots=True)
+class Reconciliation:
+    """Corrected series and the inconsistencies found."""
+
+    daily: list[DailyRecord] = field(default_factory=list)
+    monthly: list[MonthlyRecord] = field(default_factory=list)
+    index_points: list[tuple[date, float]] = field(default_factory=list)
+    events: list[MeterEvent] = field(default_factory=list)
+    clamped_rows: int = 0
+    index_corrections: int = 0
+    month_mismatches: list[dict] = field(default_factory=list)
+    index_state: IndexState = field(default_factory=IndexState)
+
+    def as_dict(self) -> dict:
+        """Return a JSON serializable summary."""
+        return {
+            "events": [
+                {
+                    "day": event.day.isoformat(),
+                    "kind": event.kind,
+                    "previous_m3": event.previous_m3,
+                    "index_m3": event.index_m3,
+                }
+                for event in self.events
+            ],
+            "clamped_rows": self.clamped_rows,
+            "index_corrections": self.index_corrections,
+            "month_mismatches": self.month_mismatches,
+        }
+
+
+def _rollover_size(previous: float, index: float) -> int | None:
+    """Return the register size if the drop looks like a counter wrap."""
+    for size in INDEX_REGISTER_SIZES_M3:
+        if previous < size and previous >= size * 0.9 and index < size * 0.1:
+            return size
+    return None
+
+
+def _index_points(
+    daily: list[DailyRecord], result: Reconciliation, state: IndexState
+) -> None:
+    """Build a monotonic index across rollovers, replacements and jitter."""
+    for rec in daily:
+        state.consumed += rec.liters
+        if rec.index_m3 is None:
+            continue
+        if state.previous is not None and rec.index_m3 < state.previous:
+            drop = state.previous - rec.index_m3
+            if drop <= INDEX_JITTER_M3:
+                # Estimated index corrected downwards, hold the last value
+                result.index_corrections += 1
+                result.index_points.append((rec.day, state.continuous))
+                continue
+            if size := _rollover_size(state.previous, rec.index_m3):
+                state.offset += size
+                kind = ROLLOVER
+            else:
+                # New meter, bridge the gap with the daily consumption
+                state.offset += drop + state.consumed / 1000
+                kind = REPLACEMENT
+            result.events.append(
+                MeterEvent(rec.day, kind, state.previous, rec.index_m3)
+            )
+        state.continuous = max(state.continuous, round(rec.index_m3 + state.offset, 3))
+        result.index_points.append((rec.day, state.continuous))
+        state.previous = rec.index_m3
+        state.consumed = 0
+
+
+def _month_mismatches(
+    daily: list[DailyRecord], monthly: list[MonthlyRecord]
+) -> list[dict]:
+    """Compare the fully covered months of the daily series to the monthly one."""
+    liters: dict[tuple[int, int], int] = {}
+    days: dict[tuple[int, int], int] = {}
+    for rec in daily:
+        key = (rec.day.year, rec.day.month)
+        liters[key] = liters.get(key, 0) + rec.liters
+        days[key] = days.get(key, 0) + 1
+    mismatches = []
+    for rec in monthly:
+        key = (rec.year, rec.month)
+        if days.get(key) != monthrange(rec.year, rec.month)[1]:
+            continue
+        daily_m3 = liters[key] / 1000
+        if abs(daily_m3 - rec.m3) > max(
+            MONTH_MISMATCH_M3, rec.m3 * MONTH_MISMATCH_RATIO
+        ):
+            mismatches.append(
+                {
+                    "month": f"{rec.year}-{rec.month:02d}",
+                    "daily_m3": round(daily_m3, 3),
+                    "monthly_m3": rec.m3,
+                }
+            )
+    return mismatches
+
+
+def reconcile(
+    daily: list[DailyRecord],
+    monthly: list[MonthlyRecord],
+    index_state: IndexState | None = None,
+) -> Reconciliation:
+    """Cross-check sorted records and return series safe for sum statistics.
+
+    The index continues from index_state, the state after the archived rows.
+    """
+    result = Reconciliation()
+    if index_state is not None:
+        result.index_state = replace(index_state)
+    for rec in daily:
+        if rec.liters < 0:
+            result.clamped_rows += 1
+            rec = replace(rec, liters=0, m3=0.0)  # noqa: PLW2901
+        result.daily.append(rec)
+    for rec in monthly:
+        if rec.m3 < 0:
+            result.clamped_rows += 1
+            rec = replace(rec, m3=0.0)  # noqa: PLW2901
+        result.monthly.append(rec)
+    _index_points(result.daily, result, result.index_state)
+    result.month_mismatches = _month_mismatches(result.daily, result.monthly)
+    return result
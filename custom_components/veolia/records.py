@@ -0,0 +1,188 @@
+"""Typed consumption records validated once at fetch time."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import astuple, dataclass, is_dataclass
+from datetime import date
+from typing import Any
+import unicodedata
+
+from .const import (
+    CONSO,
+    CONSO_FIABILITY,
+    CUBIC_METER,
+    DATA_DATE,
+    IDX,
+    IDX_FIABILITY,
+    LITRE,
+    MONTH,
+    YEAR,
+)
+
+
+@dataclass(slots=True, frozen=True)
+class DailyRecord:
+    """Daily meter reading."""
+
+    day: date
+    liters: int
+    m3: float
+    index_m3: float | None = None
+    fiability: str | None = None
+
+    def as_dict(self) -> dict:
+        """Return a JSON serializable dict."""
+        return {
+            "day": self.day.isoformat(),
+            "liters": self.liters,
+            "m3": self.m3,
+            "index_m3": self.index_m3,
+            "fiability": self.fiability,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DailyRecord:
+        """Build a record from as_dict output."""
+        return cls(**{**data, "day": date.fromisoformat(data["day"])})
+
+
+@dataclass(slots=True, frozen=True)
+class MonthlyRecord:
+    """Monthly consumption."""
+
+    year: int
+    month: int
+    m3: float
+    index_m3: float | None = None
+    fiability: str | None = None
+
+    @property
+    def first(self) -> date:
+        """Return the first day of the month."""
+        return date(self.year, self.month, 1)
+
+    def as_dict(self) -> dict:
+        """Return a JSON serializable dict."""
+        return {
+            "year": self.year,
+            "month": self.month,
+            "m3": self.m3,
+            "index_m3": self.index_m3,
+            "fiability": self.fiability,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> MonthlyRecord:
+        """Build a record from as_dict output."""
+        return cls(**data)
+
+
+@dataclass(slots=True, frozen=True)
+class RecordError:
+    """Row rejected by the validation."""
+
+    kind: str
+    position: int
+    reason: str
+
+
+def is_estimated(fiability: str | None) -> bool:
+    """Return True for an estimated reading, False when measured or unknown."""
+    if not fiability:
+        return False
+    text = unicodedata.normalize("NFKD", fiability).encode("ascii", "ignore")
+    return "ESTIM" in text.decode().upper()
+
+
+def _number(value: Any, field: str) -> float | None:
+    """Convert an optional numeric field."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise TypeError(f"invalid {field}: {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError) as err:
+        raise TypeError(f"invalid {field}: {value!r}") from err
+
+
+def _volume(rec: dict) -> tuple[int, float]:
+    """Return the consumption in liters and m3, zero when not reported."""
+    conso = rec.get(CONSO) or {}
+    liters = _number(conso.get(LITRE), "liters")
+    m3 = _number(conso.get(CUBIC_METER), "m3")
+    if liters is None:
+        liters = 0.0 if m3 is None else m3 * 1000
+    if m3 is None:
+        m3 = liters / 1000
+    return round(liters), m3
+
+
+def parse_daily(rec: dict) -> DailyRecord:
+    """Validate a daily consumption payload."""
+    day = date.fromisoformat(rec.get(DATA_DATE) or "")
+    liters, m3 = _volume(rec)
+    return DailyRecord(
+        day=day,
+        liters=liters,
+        m3=m3,
+        index_m3=_number((rec.get(IDX) or {}).get(CUBIC_METER), "index"),
+        fiability=rec.get(IDX_FIABILITY),
+    )
+
+
+def parse_monthly(rec: dict) -> MonthlyRecord:
+    """Validate a monthly consumption payload."""
+    year, month = int(rec.get(YEAR) or 0), int(rec.get(MONTH) or 0)
+    if year < 1 or not 1 <= month <= 12:
+        raise ValueError(f"invalid month: {year}-{month}")
+    _, m3 = _volume(rec)
+    return MonthlyRecord(
+        year=year,
+        month=month,
+        m3=m3,
+        index_m3=_number((rec.get(IDX) or {}).get(CUBIC_METER), "index"),
+        fiability=rec.get(CONSO_FIABILITY),
+    )
+
+
+def parse_records(
+    kind: str,
+    payloads: Iterable[dict],
+    parser: Callable[[dict], Any],
+    errors: list[RecordError],
+) -> list:
+    """Validate payloads, collecting an error for each rejected row."""
+    records = []
+    for position, payload in enumerate(payloads):
+        try:
+            records.append(parser(payload))
+        except (AttributeError, TypeError, ValueError) as err:
+            errors.append(RecordError(kind, position, str(err)))
+    return records
+
+
+def validate_alert_settings(settings: Any, errors: list[RecordError]) -> None:
+    """Normalize the alert settings thresholds in place."""
+    for field in ("daily_threshold", "monthly_threshold"):
+        try:
+            value = _number(getattr(settings, field), field)
+        except TypeError as err:
+            errors.append(RecordError("alert_settings", 0, str(err)))
+            value = None
+        setattr(settings, field, None if value is None else int(value))
+
+
+def unoccupied_mode(settings) -> bool:
+    """Return True when the daily alert is used as the unoccupied alert."""
+    return bool(settings and settings.daily_enabled and settings.daily_threshold == 0)
+
+
+def alert_settings_key(settings) -> tuple | None:
+    """Return a hashable snapshot of the alert settings."""
+    if settings is None:
+        return None
+    return (
+        astuple(settings) if is_dataclass(settings) else tuple(vars(settings).values())
+    )
@@ -1,347 +1,399 @@
 """Sensor platform for Veolia."""
 
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from functools import partial
+
 from homeassistant.components.recorder.statistics import (
     StatisticMeanType,
     StatisticMetaData,
     async_import_statistics,
 )
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.const import UnitOfVolume
 from homeassistant.core import callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER, STATISTICS_BATCH_ROWS
+from .entity import VeoliaDescriptionMixin, VeoliaEntity
+from .model import VeoliaComputed, VeoliaModel
+from .timeutil import rows_between
+
+
+@dataclass(frozen=True, kw_only=True)
+class VeoliaSensorEntityDescription(SensorEntityDescription, VeoliaDescriptionMixin):
+    """Describes a Veolia sensor."""
+
+    statistics_fn: Callable[[VeoliaComputed], list[dict]] | None = None
+    statistics_mean: bool = False
+    priced: bool = False
+
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+    """Return first and last day of a month."""
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+def _last_report(model: VeoliaModel) -> dict:
+    """Return the day of the last reading."""
+    last_date = model.computed.last_date
+    return {"last_report": last_date.isoformat() if last_date else None}
+
+
+def _rolling(days: int, model: VeoliaModel) -> int | None:
+    """Return the consumption of the last days up to the last reading."""
+    comp = model.computed
+    if comp.last_date is None:
+        return None
+    return comp.daily_series.rolling(comp.last_date, days)
+
+
+def _same_month_last_year(model: VeoliaModel) -> int | None:
+    """Return the consumption of the month of the last reading, a year earlier."""
+    comp = model.computed
+    if comp.last_date is None:
+        return None
+    first, last = _month_bounds(comp.last_date.year - 1, comp.last_date.month)
+    return comp.daily_series.sum_between(first, last)
+
+
+def _same_month_last_year_attributes(model: VeoliaModel) -> dict:
+    """Compare the month to date with the same period last year."""
+    comp = model.computed
+    if comp.last_date is None:
+        return {}
+    end = comp.last_date
+    try:
+        end_last_year = end.replace(year=end.year - 1)
+    except ValueError:
+        # February 29th
+        end_last_year = end.replace(year=end.year - 1, day=28)
+    series = comp.daily_series
+    return {
+        "month_to_date": series.sum_between(end.replace(day=1), end),
+        "same_period_last_year": series.sum_between(
+            end_last_year.replace(day=1), end_last_year
+        ),
+        "last_report": end.isoformat(),
+    }
+
+
+def _latest_month_change(model: VeoliaModel) -> float | None:
+    """Return the change of the latest month against the same month last year."""
+    comp = model.computed
+    last = comp.summary.monthly_last
+    if last is None:
+        return None
+    return comp.monthly_aggregate.delta(last.year, last.month)
+
+
+def _latest_month_attributes(model: VeoliaModel) -> dict:
+    """Compare the latest month with the same month last year."""
+    comp = model.computed
+    last = comp.summary.monthly_last
+    if last is None:
+        return {}
+    return {
+        "month": f"{last.year}-{last.month:02d}",
+        "consumption": comp.monthly_aggregate.monthly_m3.get((last.year, last.month)),
+        "same_month_last_year": comp.monthly_aggregate.monthly_m3.get(
+            (last.year - 1, last.month)
+        ),
+    }
+
+
+def _forecast_attributes(period: str, model: VeoliaModel) -> dict:
+    """Return the confidence interval of a forecast."""
+    forecast = model.forecast
+    if forecast is None:
+        return {}
+    return {
+        "low": getattr(forecast, f"{period}_end_low_m3"),
+        "high": getattr(forecast, f"{period}_end_high_m3"),
+        "daily_rate_liters": forecast.daily_rate_liters,
+        "last_report": forecast.reference_day.isoformat(),
+    }
+
+
+def _priced(model: VeoliaModel) -> bool:
+    """Return true if a tariff is configured."""
+    return model.computed.annual_cost is not None
+
+
+SENSORS: tuple[VeoliaSensorEntityDescription, ...] = (
+    VeoliaSensorEntityDescription(
+        key="last_index",
+        translation_key="veolia_index",
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:counter",
+        value_fn=lambda model: model.computed.last_index_m3,
+        attributes_fn=lambda model: {
+            "data_type": model.computed.daily_fiability,
+            **_last_report(model),
+        },
+    ),
+    VeoliaSensorEntityDescription(
+        key="daily_consumption",
+        translation_key="daily_consumption",
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        suggested_display_precision=0,
+        icon="mdi:water",
+        value_fn=lambda model: model.computed.daily_today_liters,
+        attributes_fn=lambda model: {
+            "data_type": model.computed.daily_today_fiability,
+            **_last_report(model),
+        },
+        statistics_fn=lambda comp: comp.hourly_stats_liters or comp.daily_stats_liters,
+        statistics_mean=True,
+    ),
+    VeoliaSensorEntityDescription(
+        key="monthly_consumption",
+        translation_key="monthly_consumption",
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:water",
+        value_fn=lambda model: model.computed.monthly_latest_m3,
+        attributes_fn=lambda model: {"data_type": model.computed.monthly_fiability},
+        statistics_fn=lambda comp: comp.monthly_stats_cubic_meters,
+    ),
+    VeoliaSensorEntityDescription(
+        key="annual_consumption",
+        translation_key="annual_consumption",
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:water",
+        value_fn=lambda model: model.computed.annual_total_m3,
+        attributes_fn=lambda model: model.computed.monthly_aggregate.as_dict(),
+    ),
+    VeoliaSensorEntityDescription(
+        key="previous_year_consumption",
+        translation_key="previous_year_consumption",
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:calendar-compare",
+        value_fn=lambda model: model.computed.monthly_aggregate.total(
+            dt_util.now().year - 1
+        ),
+    ),
+    VeoliaSensorEntityDescription(
+        key="monthly_consumption_change",
+        translation_key="monthly_consumption_change",
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:delta",
+        value_fn=_latest_month_change,
+        attributes_fn=_latest_month_attributes,
+    ),
+    VeoliaSensorEntityDescription(
+        key="last_date",
+        translation_key="last_consumption_date",
+        icon="mdi:calendar",
+        value_fn=lambda model: model.computed.last_date,
+    ),
+    VeoliaSensorEntityDescription(
+        key="same_month_last_year_consumption",
+        translation_key="same_month_last_year_consumption",
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        suggested_display_precision=0,
+        icon="mdi:calendar-compare",
+        value_fn=_same_month_last_year,
+        attributes_fn=_same_month_last_year_attributes,
+    ),
+    VeoliaSensorEntityDescription(
+        key="month_end_forecast",
+        translation_key="month_end_forecast",
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:chart-line",
+        value_fn=lambda model: model.forecast.month_end_m3 if model.forecast else None,
+        attributes_fn=partial(_forecast_attributes, "month"),
+    ),
+    VeoliaSensorEntityDescription(
+        key="year_end_forecast",
+        translation_key="year_end_forecast",
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        suggested_display_precision=3,
+        icon="mdi:chart-line",
+        value_fn=lambda model: model.forecast.year_end_m3 if model.forecast else None,
+        attributes_fn=partial(_forecast_attributes, "year"),
+    ),
+    VeoliaSensorEntityDescription(
+        key="daily_cost",
+        translation_key="daily_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:cash",
+        value_fn=lambda model: model.computed.last_daily_cost,
+        available_fn=_priced,
+        attributes_fn=_last_report,
+        statistics_fn=lambda comp: comp.daily_cost_stats,
+        priced=True,
+    ),
+    VeoliaSensorEntityDescription(
+        key="monthly_cost",
+        translation_key="monthly_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:cash",
+        value_fn=lambda model: model.computed.last_monthly_cost,
+        available_fn=_priced,
+        attributes_fn=lambda model: {"data_type": model.computed.monthly_fiability},
+        statistics_fn=lambda comp: comp.monthly_cost_stats,
+        priced=True,
+    ),
+    VeoliaSensorEntityDescription(
+        key="annual_cost",
+        translation_key="annual_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:cash-multiple",
+        value_fn=lambda model: model.computed.annual_cost,
+        available_fn=_priced,
+        priced=True,
+    ),
+)
 
-from .const import DOMAIN, LOGGER
-from .entity import VeoliaMesurements
+
+def rolling_description(days: int) -> VeoliaSensorEntityDescription:
+    """Describe the consumption sensor of a rolling window."""
+    return VeoliaSensorEntityDescription(
+        key=f"rolling_{days}d_consumption",
+        translation_key="rolling_consumption",
+        translation_placeholders={"days": str(days)},
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        suggested_display_precision=0,
+        icon="mdi:water",
+        value_fn=partial(_rolling, days),
+        attributes_fn=_last_report,
+    )
 
 
 async def async_setup_entry(hass, entry, async_add_devices) -> None:
     """Set up sensor platform."""
     LOGGER.debug("Setting up sensor platform")
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    sensors = [
-        LastIndexSensor(coordinator, entry),
-        DailyConsumption(coordinator, entry),
-        MonthlyConsumption(coordinator, entry),
-        AnnualConsumption(coordinator, entry),
-        LastDateSensor(coordinator, entry),
+    descriptions = [
+        (
+            replace(desc, native_unit_of_measurement=hass.config.currency)
+            if desc.priced
+            else desc
+        )
+        for desc in SENSORS
     ]
+    sensors = []
+    for coordinator in hass.data[DOMAIN][entry.entry_id].coordinators.values():
+        sensors.extend(
+            VeoliaSensor(coordinator, entry, desc)
+            for desc in (
+                *descriptions,
+                *map(rolling_description, coordinator.rolling_windows),
+            )
+        )
     async_add_devices(sensors)
 
 
-class LastIndexSensor(VeoliaMesurements):
-    """LastIndexSensor sensor."""
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_last_index"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "veolia_index"
-
-    @property
-    def native_value(self) -> float | None:
-        """Return sensor value."""
-        value = self.coordinator.data.computed.last_index_m3
-        LOGGER.debug("Sensor %s value : %s", self.__class__.__name__, value)
-        return value
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra state."""
-        comp = self.coordinator.data.computed
-        return {
-            "data_type": comp.daily_fiability,
-            "last_report": comp.last_date.isoformat() if comp.last_date else None,
-        }
-
-    @property
-    def state_class(self) -> str:
-        """Return the state_class of the sensor."""
-        return SensorStateClass.TOTAL_INCREASING
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """Return the unit_of_measurement of the sensor."""
-        return UnitOfVolume.CUBIC_METERS
-
-    @property
-    def suggested_display_precision(self) -> int:
-        """Return the suggested display precision."""
-        return 3
-
-    @property
-    def icon(self) -> str | None:
-        """Set icon."""
-        return "mdi:counter"
-
-    # NOT WORKING
-    # async def async_added_to_hass(self) -> None:
-    #     """Start historical update on HA add."""
-    #     await self._update_historical_data()
-    #     await super().async_added_to_hass()
-
-    @callback
-    async def _update_historical_data(self) -> None:
-        """Update historical values."""
-        LOGGER.debug("Update_historical_data for %s", self.__class__.__name__)
-        stats = self.coordinator.data.computed.index_stats_m3
-        if not stats:
-            LOGGER.debug("No data update for %s", self.__class__.__name__)
-            return
-        metadata = StatisticMetaData(
-            has_mean=False,
-            has_sum=True,
-            mean_type=StatisticMeanType.NONE,
-            name=None,
-            source="recorder",
-            statistic_id=self.entity_id,
-            unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+def _async_import_statistics(
+    coordinator, metadata: StatisticMetaData, stats: list[dict]
+) -> None:
+    """Import statistics by bounded batches, unless disabled in the options."""
+    if not coordinator.import_statistics:
+        LOGGER.debug("Statistics import disabled for %s", metadata["statistic_id"])
+        return
+    for i in range(0, len(stats), STATISTICS_BATCH_ROWS):
+        async_import_statistics(
+            coordinator.hass, metadata, stats[i : i + STATISTICS_BATCH_ROWS]
         )
-        LOGGER.debug("-> StatisticMetaData %s Data : %s", metadata, stats)
-        async_import_statistics(self.hass, metadata, stats)
 
 
-class DailyConsumption(VeoliaMesurements):
-    """DailyConsumption sensor."""
+class VeoliaSensor(VeoliaEntity, SensorEntity):
+    """Veolia sensor generated from a description."""
 
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_daily_consumption"
+    entity_description: VeoliaSensorEntityDescription
 
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "daily_consumption"
-
-    @property
-    def native_value(self) -> int | None:
-        """Return sensor value."""
-        value = self.coordinator.data.computed.daily_today_liters
-        LOGGER.debug("Sensor %s value : %s", self.__class__.__name__, value)
-        return value
+    def __init__(self, coordinator, config_entry, description) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator, config_entry, description)
+        self._tariff_revision: int | None = None
 
     @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra state."""
-        comp = self.coordinator.data.computed
-        return {
-            "data_type": comp.daily_today_fiability,
-            "last_report": comp.last_date.isoformat() if comp.last_date else None,
-        }
+    def native_value(self):
+        """Return the value evaluated at the last update."""
+        return self._value
 
     async def async_added_to_hass(self) -> None:
         """Start historical update on HA add."""
-        await self._update_historical_data()
+        if self.entity_description.statistics_fn is not None:
+            await self._update_historical_data()
+            self.async_listen_statistics(self._update_historical_data)
         await super().async_added_to_hass()
 
     @callback
-    async def _update_historical_data(self) -> None:
-        """Update historical values."""
-        LOGGER.debug("Update_historical_data for %s", self.__class__.__name__)
-        stats = self.coordinator.data.computed.daily_stats_liters
-        if not stats:
-            LOGGER.debug("No data update for %s", self.__class__.__name__)
-            return
-        metadata = StatisticMetaData(
-            has_mean=True,
-            has_sum=True,
-            mean_type=StatisticMeanType.ARITHMETIC,
-            name=None,
-            source="recorder",
-            statistic_id=self.entity_id,
-            unit_of_measurement=UnitOfVolume.LITERS,
-        )
-        LOGGER.debug("-> StatisticMetaData %s Data : %s", metadata, stats)
-        async_import_statistics(self.hass, metadata, stats)
-
-    @property
-    def state_class(self) -> str:
-        """Return the state_class of the sensor."""
-        return SensorStateClass.TOTAL
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """Return the unit_of_measurement of the sensor."""
-        return UnitOfVolume.LITERS
-
-    @property
-    def suggested_display_precision(self) -> int:
-        """Return the suggested display precision."""
-        return 0
-
-    @property
-    def icon(self) -> str | None:
-        """Set icon."""
-        return "mdi:water"
-
-
-class MonthlyConsumption(VeoliaMesurements):
-    """MonthlyConsumption sensor."""
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_monthly_consumption"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "monthly_consumption"
-
-    @property
-    def native_value(self) -> float | None:
-        """Return sensor value."""
-        value = self.coordinator.data.computed.monthly_latest_m3
-        LOGGER.debug("Sensor %s value : %s", self.__class__.__name__, value)
-        return value
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra state."""
-        return {"data_type": self.coordinator.data.computed.monthly_fiability}
-
-    @property
-    def state_class(self) -> str:
-        """Return the state_class of the sensor."""
-        return SensorStateClass.TOTAL
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """Return the unit_of_measurement of the sensor."""
-        return UnitOfVolume.CUBIC_METERS
-
-    @property
-    def suggested_display_precision(self) -> int:
-        """Return the suggested display precision."""
-        return 3
-
-    @property
-    def icon(self) -> str | None:
-        """Set icon."""
-        return "mdi:water"
-
-    async def async_added_to_hass(self) -> None:
-        """Start historical update on HA add."""
-        await self._update_historical_data()
-        await super().async_added_to_hass()
+    def _handle_coordinator_update(self) -> None:
+        """Re-import the priced history when the tariff changed."""
+        desc = self.entity_description
+        if (
+            desc.priced
+            and desc.statistics_fn is not None
+            and self._tariff_revision != self.coordinator.tariff_revision
+        ):
+            self.hass.async_create_task(self._update_historical_data())
+        super()._handle_coordinator_update()
 
     @callback
-    async def _update_historical_data(self) -> None:
+    async def _update_historical_data(
+        self, start: date | None = None, end: date | None = None
+    ) -> None:
         """Update historical values."""
-        LOGGER.debug("Update_historical_data for %s", self.__class__.__name__)
-        stats = self.coordinator.data.computed.monthly_stats_cubic_meters
+        LOGGER.debug("Update_historical_data for %s", self.entity_id)
+        self._tariff_revision = self.coordinator.tariff_revision
+        desc = self.entity_description
+        stats = rows_between(
+            desc.statistics_fn(self.coordinator.data.computed),
+            start,
+            end,
+            dt_util.get_default_time_zone(),
+        )
         if not stats:
-            LOGGER.debug("No data update for %s", self.__class__.__name__)
+            LOGGER.debug("No data update for %s", self.entity_id)
             return
         metadata = StatisticMetaData(
-            has_mean=False,
+            has_mean=desc.statistics_mean,
             has_sum=True,
-            mean_type=StatisticMeanType.NONE,
+            mean_type=(
+                StatisticMeanType.ARITHMETIC
+                if desc.statistics_mean
+                else StatisticMeanType.NONE
+            ),
             name=None,
             source="recorder",
             statistic_id=self.entity_id,
-            unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+            unit_of_measurement=self.native_unit_of_measurement,
         )
         LOGGER.debug("-> StatisticMetaData %s Data : %s", metadata, stats)
-        async_import_statistics(self.hass, metadata, stats)
-
-
-class AnnualConsumption(VeoliaMesurements):
-    """AnnualConsumption sensor."""
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_annual_consumption"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "annual_consumption"
-
-    @property
-    def native_value(self) -> float | None:
-        """Return sensor value."""
-        value = self.coordinator.data.computed.annual_total_m3
-        LOGGER.debug("Sensor %s value : %s", self.__class__.__name__, value)
-        return value
-
-    @property
-    def state_class(self) -> str:
-        """Return the state_class of the sensor."""
-        return SensorStateClass.TOTAL
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """Return the unit_of_measurement of the sensor."""
-        return UnitOfVolume.CUBIC_METERS
-
-    @property
-    def suggested_display_precision(self) -> int:
-        """Return the suggested display precision."""
-        return 3
-
-    @property
-    def icon(self) -> str | None:
-        """Set icon."""
-        return "mdi:water"
-
-
-class LastDateSensor(CoordinatorEntity, SensorEntity):
-    """LastDateSensor sensor."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        super().__init__(coordinator)
-        self.config_entry = config_entry
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_last_date"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "last_consumption_date"
-
-    @property
-    def native_value(self) -> str | None:
-        """Return sensor value."""
-        value = self.coordinator.data.computed.last_date
-        LOGGER.debug("Sensor %s value : %s", self.__class__.__name__, value)
-        return value
-
-    @property
-    def icon(self) -> str | None:
-        """Set icon."""
-        return "mdi:calendar"
+        _async_import_statistics(self.coordinator, metadata, stats)
@@ -0,0 +1,198 @@
+"""Daily consumption series with prefix sums."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from operator import attrgetter
+
+from .records import DailyRecord, is_estimated
+
+
+@dataclass(slots=True)
+class DailySeries:
+    """Dense daily liters series, missing days count as zero."""
+
+    start: date | None = None
+    prefix: list[int] = field(default_factory=lambda: [0])
+
+    @property
+    def end(self) -> date | None:
+        """Return the last day of the series."""
+        if self.start is None:
+            return None
+        return self.start + timedelta(days=len(self.prefix) - 2)
+
+    def append(self, d: date, liters: int) -> None:
+        """Append a reading, zero-filling the gap since the previous day."""
+        if self.start is None:
+            self.start = d
+        offset = (d - self.start).days + 1
+        if offset < len(self.prefix):
+            # Duplicate or out of order day
+            return
+        last = self.prefix[-1]
+        self.prefix.extend([last] * (offset - len(self.prefix)))
+        self.prefix.append(last + liters)
+
+    def sum_between(self, first: date, last: date) -> int | None:
+        """Return liters consumed from first to last inclusive, None if not covered."""
+        if self.start is None or first > last:
+            return None
+        i = (first - self.start).days
+        j = (last - self.start).days + 1
+        if i < 0 or j >= len(self.prefix):
+            return None
+        return self.prefix[j] - self.prefix[i]
+
+    def rolling(self, end: date, days: int) -> int | None:
+        """Return liters consumed over the window of days ending on end."""
+        return self.sum_between(end - timedelta(days=days - 1), end)
+
+
+@dataclass(slots=True)
+class SeriesSummary:
+    """Counters collected while the model walks the records."""
+
+    daily_count: int = 0
+    daily_first: date | None = None
+    daily_last: date | None = None
+    daily_missing_days: int = 0
+    daily_longest_gap: int = 0
+    daily_fiability: Counter = field(default_factory=Counter)
+    monthly_count: int = 0
+    monthly_first: date | None = None
+    monthly_last: date | None = None
+    monthly_fiability: Counter = field(default_factory=Counter)
+
+    def add_daily(self, d: date, fiability: str | None) -> None:
+        """Count a daily record."""
+        if self.daily_last is not None:
+            gap = (d - self.daily_last).days - 1
+            if gap > 0:
+                self.daily_missing_days += gap
+                self.daily_longest_gap = max(self.daily_longest_gap, gap)
+        if self.daily_first is None:
+            self.daily_first = d
+        self.daily_last = d
+        self.daily_count += 1
+        self.daily_fiability[fiability] += 1
+
+    def add_monthly(self, first: date, fiability: str | None) -> None:
+        """Count a monthly record."""
+        if self.monthly_first is None:
+            self.monthly_first = first
+        self.monthly_last = first
+        self.monthly_count += 1
+        self.monthly_fiability[fiability] += 1
+
+    def as_dict(self) -> dict:
+        """Return a JSON serializable summary."""
+        return {
+            "daily": {
+                "count": self.daily_count,
+                "first": _iso(self.daily_first),
+                "last": _iso(self.daily_last),
+                "missing_days": self.daily_missing_days,
+                "longest_gap_days": self.daily_longest_gap,
+                "fiability": {str(k): v for k, v in self.daily_fiability.items()},
+            },
+            "monthly": {
+                "count": self.monthly_count,
+                "first": _iso(self.monthly_first),
+                "last": _iso(self.monthly_last),
+                "fiability": {str(k): v for k, v in self.monthly_fiability.items()},
+            },
+        }
+
+
+@dataclass(slots=True)
+class MonthlyAggregate:
+    """Yearly totals and year over year deltas collected in the monthly pass."""
+
+    monthly_m3: dict[tuple[int, int], float] = field(default_factory=dict)
+    totals_m3: dict[int, float] = field(default_factory=dict)
+    months: Counter = field(default_factory=Counter)
+    deltas_m3: dict[tuple[int, int], float] = field(default_factory=dict)
+    year_deltas_m3: dict[int, float] = field(default_factory=dict)
+
+    def add(self, year: int, month: int, m3: float) -> None:
+        """Add the consumption of a month, compared with the previous year."""
+        self.monthly_m3[year, month] = m3
+        self.totals_m3[year] = self.totals_m3.get(year, 0) + m3
+        self.months[year] += 1
+        previous = self.monthly_m3.get((year - 1, month))
+        if previous is not None:
+            delta = m3 - previous
+            self.deltas_m3[year, month] = delta
+            self.year_deltas_m3[year] = self.year_deltas_m3.get(year, 0) + delta
+
+    def total(self, year: int) -> float | None:
+        """Return the consumption of a year, None without any month."""
+        total = self.totals_m3.get(year)
+        return None if total is None else round(total, 3)
+
+    def delta(self, year: int, month: int) -> float | None:
+        """Return the change of a month against the same month a year earlier."""
+        delta = self.deltas_m3.get((year, month))
+        return None if delta is None else round(delta, 3)
+
+    def as_dict(self) -> dict:
+        """Return the yearly totals, monthly averages and changes."""
+        return {
+            "yearly_totals": {y: round(t, 3) for y, t in self.totals_m3.items()},
+            "monthly_averages": {
+                y: round(t / self.months[y], 3) for y, t in self.totals_m3.items()
+            },
+            "changes_vs_previous_year": {
+                y: round(d, 3) for y, d in self.year_deltas_m3.items()
+            },
+        }
+
+
+def _iso(d: date | None) -> str | None:
+    """Format an optional date."""
+    return d.isoformat() if d else None
+
+
+def estimated_share(
+    records: list[DailyRecord], start: date | None = None, end: date | None = None
+) -> dict:
+    """Return the share of estimated days and liters of sorted daily records."""
+    key = attrgetter("day")
+    lo = 0 if start is None else bisect_left(records, start, key=key)
+    hi = len(records) if end is None else bisect_right(records, end, key=key)
+    days = estimated_days = liters = estimated_liters = 0
+    for rec in records[lo:hi]:
+        days += 1
+        liters += rec.liters
+        if is_estimated(rec.fiability):
+            estimated_days += 1
+            estimated_liters += rec.liters
+    return {
+        "start": _iso(records[lo].day) if lo < hi else None,
+        "end": _iso(records[hi - 1].day) if lo < hi else None,
+        "days": days,
+        "estimated_days": estimated_days,
+        "liters": liters,
+        "estimated_liters": estimated_liters,
+        "days_share": round(estimated_days / days, 4) if days else None,
+        "liters_share": round(estimated_liters / liters, 4) if liters else None,
+    }
+
+
+def iter_new_readings(
+    records: list[DailyRecord], last_day: date | None
+) -> Iterator[tuple[date, int]]:
+    """Yield (day, liters) for sorted daily records newer than last_day."""
+    start = 0
+    if last_day is not None:
+        # Walk back from the end, new records are usually the last few
+        start = len(records)
+        while start > 0 and records[start - 1].day > last_day:
+            start -= 1
+    for rec in records[start:]:
+        yield rec.day, rec.liters
@@ -0,0 +1,315 @@
+"""Services for the Veolia integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+import csv
+from itertools import chain, islice
+from pathlib import Path
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EXPORT_CHUNK_ROWS, EXPORT_DIR, LOGGER
+from .importer import read_history_file
+from .model import iter_archived_stats
+
+SERVICE_EXPORT_HISTORY = "export_history"
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_REFRESH_CONSUMPTION = "refresh_consumption"
+SERVICE_REFRESH_ALERT_SETTINGS = "refresh_alert_settings"
+SERVICE_REBUILD_STATISTICS = "rebuild_statistics"
+SERVICE_ESTIMATED_SHARE = "get_estimated_share"
+
+ATTR_FORMAT = "format"
+ATTR_PATH = "path"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_SERIES = "series"
+ATTR_SUBSCRIPTION_ID = "subscription_id"
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+EXPORT_SERIES = {
+    "daily": "daily_stats_liters",
+    "monthly": "monthly_stats_cubic_meters",
+    "index": "index_stats_m3",
+}
+EXPORT_COLUMNS = ("start", "state", "sum")
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_CSV): vol.In(
+            [FORMAT_CSV, FORMAT_PARQUET]
+        ),
+        vol.Optional(ATTR_SERIES, default=list(EXPORT_SERIES)): vol.All(
+            cv.ensure_list, [vol.In(list(EXPORT_SERIES))]
+        ),
+    }
+)
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_SUBSCRIPTION_ID): cv.string,
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+DATE_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant, entry_id: str | None) -> dict:
+    """Return the meter coordinators targeted by a service call, by unique prefix."""
+    accounts = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        if entry_id not in accounts:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_loaded",
+                translation_placeholders={"entry_id": entry_id},
+            )
+        accounts = {entry_id: accounts[entry_id]}
+    return {
+        coordinator.unique_prefix: coordinator
+        for account in accounts.values()
+        for coordinator in account.coordinators.values()
+    }
+
+
+def _iter_rows(stats: Iterable[dict]) -> Iterator[tuple]:
+    """Yield export rows from statistics rows."""
+    for row in stats:
+        yield row["start"].isoformat(), row["state"], row["sum"]
+
+
+def _iter_chunks(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    """Yield rows by bounded chunks."""
+    while chunk := list(islice(rows, EXPORT_CHUNK_ROWS)):
+        yield chunk
+
+
+def _write_csv(path: Path, rows: Iterator[tuple]) -> int:
+    """Write rows to a CSV file chunk by chunk."""
+    written = 0
+    with path.open("w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in _iter_chunks(rows):
+            writer.writerows(chunk)
+            written += len(chunk)
+    return written
+
+
+def _write_parquet(path: Path, rows: Iterator[tuple]) -> int:
+    """Write rows to a Parquet file, one row group per chunk."""
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as err:
+        raise HomeAssistantError(
+            translation_domain=DOMAIN, translation_key="parquet_unavailable"
+        ) from err
+
+    schema = pa.schema(
+        [("start", pa.string()), ("state", pa.float64()), ("sum", pa.float64())]
+    )
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _iter_chunks(rows):
+            columns = list(zip(*chunk, strict=True))
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            written += len(chunk)
+    return written
+
+
+def _export(
+    directory: Path, exports: list[tuple[str, Iterable[dict]]], fmt: str
+) -> dict:
+    """Write every series file, run in the executor."""
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = _write_parquet if fmt == FORMAT_PARQUET else _write_csv
+    files = {}
+    for name, stats in exports:
+        path = directory / f"{name}.{fmt}"
+        files[str(path)] = writer(path, _iter_rows(stats))
+    return files
+
+
+async def _async_export_history(call: ServiceCall) -> ServiceResponse:
+    """Export the consumption history of one or all entries."""
+    hass = call.hass
+    fmt = call.data[ATTR_FORMAT]
+    tz = dt_util.get_default_time_zone()
+    exports = []
+    for prefix, coordinator in _coordinators(
+        hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+    ).items():
+        if coordinator.data is None:
+            continue
+        # Streamed in the executor ahead of the rows in memory
+        archive = await coordinator.async_load_archived()
+        comp = coordinator.data.computed
+        exports.extend(
+            (
+                f"{prefix}_{series}",
+                chain(
+                    iter_archived_stats(archive, series, tz),
+                    getattr(comp, EXPORT_SERIES[series]),
+                ),
+            )
+            for series in call.data[ATTR_SERIES]
+        )
+    directory = Path(hass.config.path(EXPORT_DIR))
+    files = await hass.async_add_executor_job(_export, directory, exports, fmt)
+    LOGGER.debug("Exported history to %s", files)
+    return {"files": [{"path": path, "rows": rows} for path, rows in files.items()]}
+
+
+async def _async_import_history(call: ServiceCall) -> ServiceResponse:
+    """Import a Veolia CSV export into the history of an entry."""
+    hass = call.hass
+    coordinators = list(_coordinators(hass, call.data[ATTR_CONFIG_ENTRY_ID]).values())
+    subscription_id = call.data.get(ATTR_SUBSCRIPTION_ID)
+    if subscription_id is not None:
+        coordinators = [
+            coordinator
+            for coordinator in coordinators
+            if coordinator.meter.subscription_id == subscription_id
+        ]
+        if not coordinators:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="unknown_subscription",
+                translation_placeholders={"subscription_id": subscription_id},
+            )
+    # The first subscription of the entry by default
+    coordinator = coordinators[0]
+    path = Path(hass.config.path(call.data[ATTR_PATH]))
+    if not hass.config.is_allowed_path(str(path)):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_import_path",
+            translation_placeholders={"path": str(path)},
+        )
+    known = await coordinator.async_known_days()
+    try:
+        records, result = await hass.async_add_executor_job(
+            read_history_file, path, known
+        )
+    except (OSError, ValueError) as err:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_import_file",
+            translation_placeholders={"path": str(path)},
+        ) from err
+    imported = await coordinator.async_import_history(records)
+    LOGGER.debug("Imported %s records from %s: %s", imported, path, result)
+    return {
+        "rows": result.rows,
+        "imported": imported,
+        "duplicates": result.duplicates + len(records) - imported,
+        "errors": result.errors,
+        "index_unit": result.index_unit,
+    }
+
+
+async def _async_refresh_consumption(call: ServiceCall) -> None:
+    """Fetch the current month consumption of one or all entries."""
+    for coordinator in _coordinators(
+        call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+    ).values():
+        await coordinator.async_refresh_consumption()
+
+
+async def _async_refresh_alert_settings(call: ServiceCall) -> None:
+    """Fetch the alert settings of one or all entries."""
+    for coordinator in _coordinators(
+        call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+    ).values():
+        await coordinator.async_refresh_alert_settings()
+
+
+async def _async_rebuild_statistics(call: ServiceCall) -> None:
+    """Re-import the statistics of one or all entries over a date range."""
+    for coordinator in _coordinators(
+        call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+    ).values():
+        await coordinator.async_load_archive(call.data.get(ATTR_START))
+        coordinator.async_rebuild_statistics(
+            call.data.get(ATTR_START), call.data.get(ATTR_END)
+        )
+
+
+async def _async_estimated_share(call: ServiceCall) -> ServiceResponse:
+    """Return the share of estimated readings of one or all entries."""
+    return {
+        prefix: await coordinator.async_estimated_share(
+            call.data.get(ATTR_START), call.data.get(ATTR_END)
+        )
+        for prefix, coordinator in _coordinators(
+            call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+        ).items()
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Veolia services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        _async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        _async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_CONSUMPTION,
+        _async_refresh_consumption,
+        schema=REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_ALERT_SETTINGS,
+        _async_refresh_alert_settings,
+        schema=REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REBUILD_STATISTICS,
+        _async_rebuild_statistics,
+        schema=DATE_RANGE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ESTIMATED_SHARE,
+        _async_estimated_share,
+        schema=DATE_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,70 @@
+"""Water tariff schedule for Veolia."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from calendar import isleap
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date
+import re
+from typing import Any
+
+from .const import CONF_PRICE_CHANGES, CONF_PRICE_PER_M3, CONF_SUBSCRIPTION, CONF_VAT
+
+_CHANGE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})\s*[=:]\s*(\d+(?:[.,]\d+)?)$")
+
+
+def parse_price_changes(text: str | None) -> list[tuple[date, float]]:
+    """Parse 'YYYY-MM-DD=price' entries separated by ';' or new lines."""
+    changes: list[tuple[date, float]] = []
+    for raw_entry in re.split(r"[;\n]", text or ""):
+        entry = raw_entry.strip()
+        if not entry:
+            continue
+        match = _CHANGE_RE.match(entry)
+        if match is None:
+            raise ValueError(f"Invalid price change: {entry}")
+        changes.append(
+            (
+                date.fromisoformat(match.group(1)),
+                float(match.group(2).replace(",", ".")),
+            )
+        )
+    return sorted(changes)
+
+
+@dataclass(slots=True, frozen=True)
+class TariffSchedule:
+    """Sorted price per m3 schedule, VAT included."""
+
+    starts: tuple[date, ...]
+    prices: tuple[float, ...]
+    subscription_per_year: float
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> TariffSchedule | None:
+        """Build the schedule from the config entry options."""
+        base = options.get(CONF_PRICE_PER_M3)
+        if not base:
+            return None
+        vat = 1 + float(options.get(CONF_VAT) or 0) / 100
+        changes = parse_price_changes(options.get(CONF_PRICE_CHANGES))
+        schedule = [(date.min, float(base)), *changes]
+        return cls(
+            starts=tuple(start for start, _ in schedule),
+            prices=tuple(round(price * vat, 6) for _, price in schedule),
+            subscription_per_year=float(options.get(CONF_SUBSCRIPTION) or 0) * vat,
+        )
+
+    def price_at(self, d: date) -> float:
+        """Return the price per m3 applicable on a day."""
+        return self.prices[bisect_right(self.starts, d) - 1]
+
+    def subscription(self, d: date, days: int = 1) -> float:
+        """Return the subscription share for a number of days."""
+        return self.subscription_per_year * days / (366 if isleap(d.year) else 365)
+
+    def cost(self, d: date, m3: float, days: int = 1) -> float:
+        """Return the cost of a volume consumed from day d over a number of days."""
+        return round(m3 * self.price_at(d) + self.subscription(d, days), 4)
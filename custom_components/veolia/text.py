@@ -1,196 +1,90 @@
 """Text entities for Veolia integration."""
 
-from dataclasses import asdict
-
-from homeassistant.components.text import TextEntity
-
-from .const import DOMAIN, LOGGER, NAME
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.text import TextEntity, TextEntityDescription
+
+from .const import DOMAIN, LOGGER
+from .entity import VeoliaDescriptionMixin, VeoliaEntity, alert_settings_slice
+from .records import unoccupied_mode
+
+
+@dataclass(frozen=True, kw_only=True)
+class VeoliaTextEntityDescription(TextEntityDescription, VeoliaDescriptionMixin):
+    """Describes a Veolia alert threshold."""
+
+    set_fn: Callable[[object, int], None]
+
+
+def _set_daily_threshold(settings, value: int) -> None:
+    """Set the daily threshold in liters, zero disables the alert."""
+    settings.daily_enabled = value != 0
+    if value:
+        settings.daily_threshold = value
+        settings.daily_notif_email = True
+        settings.daily_notif_sms = False
+
+
+def _set_monthly_threshold(settings, value: int) -> None:
+    """Set the monthly threshold in m3, zero disables the alert."""
+    settings.monthly_enabled = value != 0
+    if value:
+        settings.monthly_threshold = value
+        settings.monthly_notif_email = True
+        settings.monthly_notif_sms = False
+
+
+TEXTS: tuple[VeoliaTextEntityDescription, ...] = (
+    VeoliaTextEntityDescription(
+        key="daily_threshold_text",
+        translation_key="daily_threshold_text",
+        icon="mdi:water-alert",
+        native_min=1,
+        native_max=6,
+        pattern="^(?:0|[1-9][0-9]{2,3}|10000)$",
+        value_fn=lambda model: str(model.alert_settings.daily_threshold or 0),
+        available_fn=lambda model: not unoccupied_mode(model.alert_settings),
+        set_fn=_set_daily_threshold,
+        slice_fn=alert_settings_slice,
+    ),
+    VeoliaTextEntityDescription(
+        key="monthly_threshold_text",
+        translation_key="monthly_threshold_text",
+        icon="mdi:water-alert",
+        native_min=1,
+        native_max=4,
+        pattern="^(?:0|[1-9][0-9]{0,2}|1000)$",
+        value_fn=lambda model: str(model.alert_settings.monthly_threshold or 0),
+        available_fn=lambda model: not unoccupied_mode(model.alert_settings),
+        set_fn=_set_monthly_threshold,
+        slice_fn=alert_settings_slice,
+    ),
+)
 
 
 async def async_setup_entry(hass, entry, async_add_entities) -> None:
     """Set up text platform."""
     LOGGER.debug("Setting up text platform")
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    texts = [
-        DailyThresholdText(coordinator, entry),
-        MonthlyThresholdText(coordinator, entry),
-    ]
-    async_add_entities(texts)
-
-
-class DailyThresholdText(TextEntity):
-    """Representation of the daily threshold text entity."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-
-    @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_daily_threshold_text"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
+    async_add_entities(
+        VeoliaText(coordinator, entry, desc)
+        for coordinator in hass.data[DOMAIN][entry.entry_id].coordinators.values()
+        for desc in TEXTS
+    )
 
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "daily_threshold_text"
-
-    @property
-    def native_max(self) -> int:
-        """Max number of characters."""
-        return 6
 
-    @property
-    def native_min(self) -> int:
-        """Min number of characters."""
-        return 1
-
-    @property
-    def pattern(self) -> str:
-        """Check validity with regex pattern."""
-        return "^(?:0|[1-9][0-9]{2,3}|10000)$"
+class VeoliaText(VeoliaEntity, TextEntity):
+    """Veolia alert threshold generated from a description."""
 
-    @property
-    def icon(self) -> str:
-        """Return the icon of the text entity."""
-        return "mdi:water-alert"
-
-    @property
-    def available(self) -> bool:
-        """Return true if the text entity is available."""
-        return not (
-            self.coordinator.data.alert_settings.daily_enabled
-            and self.coordinator.data.alert_settings.daily_threshold == 0
-        )
-
-    @property
-    def native_value(self) -> str:
-        """Return the current threshold value."""
-        return str(self.coordinator.data.alert_settings.daily_threshold or 0)
-
-    async def async_set_value(self, value: str) -> None:
-        """Set the threshold value."""
-        if int(value) == 0:
-            self.coordinator.data.alert_settings.daily_enabled = False
-        else:
-            self.coordinator.data.alert_settings.daily_enabled = True
-            self.coordinator.data.alert_settings.daily_threshold = value
-            self.coordinator.data.alert_settings.daily_notif_email = True
-            self.coordinator.data.alert_settings.daily_notif_sms = False
-
-        LOGGER.debug(
-            "Setting daily threshold to %s",
-            asdict(self.coordinator.data.alert_settings),
-        )
-        res = await self.coordinator.client_api.set_alerts_settings(
-            self.coordinator.data.alert_settings
-        )
-        if not res:
-            message = f"Failed to set alert= {self.__class__.__qualname__} settings= {asdict(self.coordinator.data.alert_settings)}"
-            raise RuntimeError(message)
-        await self.coordinator.async_request_refresh()
-        self.async_write_ha_state()
-
-
-class MonthlyThresholdText(TextEntity):
-    """Representation of the monthly threshold text entity."""
-
-    def __init__(self, coordinator, config_entry) -> None:
-        """Initialize the entity."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-
-    @property
-    def device_info(self) -> dict:
-        """Return device registry information for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
-            "manufacturer": NAME,
-            "name": f"{NAME} {self.coordinator.data.id_abonnement}",
-        }
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return f"{self.config_entry.entry_id}_monthly_threshold_text"
-
-    @property
-    def has_entity_name(self) -> bool:
-        """Indicate that entity has name defined."""
-        return True
-
-    @property
-    def translation_key(self) -> str:
-        """Translation key for this entity."""
-        return "monthly_threshold_text"
-
-    @property
-    def native_max(self) -> int:
-        """Max number of characters."""
-        return 4
-
-    @property
-    def native_min(self) -> int:
-        """Min number of characters."""
-        return 1
-
-    @property
-    def pattern(self) -> str:
-        """Check validity with regex pattern."""
-        return "^(?:0|[1-9][0-9]{0,2}|1000)$"
-
-    @property
-    def icon(self) -> str:
-        """Return the icon of the text entity."""
-        return "mdi:water-alert"
-
-    @property
-    def available(self) -> bool:
-        """Return true if the text entity is available."""
-        return not (
-            self.coordinator.data.alert_settings.daily_enabled
-            and self.coordinator.data.alert_settings.daily_threshold == 0
-        )
+    entity_description: VeoliaTextEntityDescription
 
     @property
-    def native_value(self) -> str:
-        """Return the current threshold value."""
-        return str(self.coordinator.data.alert_settings.monthly_threshold or 0)
+    def native_value(self) -> str | None:
+        """Return the threshold evaluated at the last update."""
+        return self._value
 
     async def async_set_value(self, value: str) -> None:
         """Set the threshold value."""
-        if int(value) == 0:
-            self.coordinator.data.alert_settings.monthly_enabled = False
-        else:
-            self.coordinator.data.alert_settings.monthly_enabled = True
-            self.coordinator.data.alert_settings.monthly_threshold = value
-            self.coordinator.data.alert_settings.monthly_notif_email = True
-            self.coordinator.data.alert_settings.monthly_notif_sms = False
-
-        LOGGER.debug(
-            "Setting monthly threshold to %s",
-            asdict(self.coordinator.data.alert_settings),
-        )
-        res = await self.coordinator.client_api.set_alerts_settings(
-            self.coordinator.data.alert_settings
-        )
-        if not res:
-            message = f"Failed to set alert= {self.__class__.__qualname__} settings= {asdict(self.coordinator.data.alert_settings)}"
-            raise RuntimeError(message)
-        await self.coordinator.async_request_refresh()
-        self.async_write_ha_state()
+        await self._async_save_alert_settings(int(value))
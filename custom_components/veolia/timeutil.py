@@ -0,0 +1,65 @@
+"""Local day boundaries for Veolia statistics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from operator import itemgetter
+
+_ONE_DAY = timedelta(days=1)
+_ONE_HOUR = timedelta(hours=1)
+
+
+def _to_utc_hour(local: datetime) -> datetime:
+    """Convert to UTC, rounded up to the next full hour for odd offsets."""
+    utc = local.astimezone(UTC)
+    if utc.minute or utc.second:
+        utc = utc.replace(minute=0, second=0) + _ONE_HOUR
+    return utc
+
+
+@lru_cache(maxsize=16)
+def local_midnights(year: int, tz: tzinfo) -> tuple[datetime, ...]:
+    """Return the UTC start of every local day of the year, plus Jan 1st next year."""
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+    return tuple(
+        _to_utc_hour(datetime.combine(first + timedelta(days=i), time(), tzinfo=tz))
+        for i in range(days + 1)
+    )
+
+
+def day_start(d: date, tz: tzinfo) -> datetime:
+    """Return the UTC start of the local day d."""
+    return local_midnights(d.year, tz)[d.timetuple().tm_yday - 1]
+
+
+def hour_start(hour: datetime, tz: tzinfo) -> datetime:
+    """Return the UTC start of a naive local hour."""
+    table = local_midnights(hour.year, tz)
+    yday = hour.timetuple().tm_yday
+    start = table[yday - 1]
+    if table[yday] - start == _ONE_DAY:
+        return start + timedelta(hours=hour.hour)
+    # DST transition day, let zoneinfo resolve the offset
+    return _to_utc_hour(hour.replace(tzinfo=tz))
+
+
+def rows_between(
+    rows: list[dict], start: date | None, end: date | None, tz: tzinfo
+) -> list[dict]:
+    """Return the sorted statistics rows starting from day start to day end."""
+    key = itemgetter("start")
+    lo, hi = 0, len(rows)
+    if start is not None:
+        lo = bisect_left(rows, day_start(start, tz), key=key)
+    if end is not None:
+        hi = bisect_left(rows, day_start(end + _ONE_DAY, tz), key=key)
+    return rows[lo:hi]
+
+
+def months_before(first: date, months: int) -> date:
+    """Return the first day of the month a number of months before first."""
+    index = first.year * 12 + first.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
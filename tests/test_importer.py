@@ -0,0 +1,82 @@
+"""Tests for the import of Veolia history files."""
+
+from datetime import date, timedelta
+from pathlib import Path
+import time
+from zoneinfo import ZoneInfo
+
+from custom_components.veolia.importer import read_history_file
+from custom_components.veolia.model import VeoliaModel
+
+HEADER = "Date de relevé;Index relevé (m3);Consommation (litres);Fiabilité"
+START = date(2015, 1, 1)
+
+
+def _write(path: Path, days: int, header: str = HEADER, index_scale: int = 1) -> Path:
+    """Write an export of days readings of 300 liters."""
+    lines = [header]
+    for i in range(days):
+        day = START + timedelta(days=i)
+        index = (1000 + (i + 1) * 0.3) * index_scale
+        lines.append(f"{day:%d/%m/%Y};{index:.3f};300;Mesuré")
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def test_skips_known_days(tmp_path: Path) -> None:
+    """Days already in the history, archived or not, are not imported again."""
+    path = _write(tmp_path / "export.csv", 10)
+    known = {START, START + timedelta(days=1)}
+    records, result = read_history_file(path, known)
+    assert [rec.day for rec in records] == [
+        START + timedelta(days=i) for i in range(2, 10)
+    ]
+    assert (result.rows, result.duplicates, result.errors) == (10, 2, 0)
+
+
+def test_index_in_liters_is_detected(tmp_path: Path) -> None:
+    """An index written in liters under an m3 header is converted."""
+    path = _write(tmp_path / "export.csv", 10, index_scale=1000)
+    records, result = read_history_file(path, ())
+    assert result.index_unit == "L"
+    assert records[0].index_m3 == 1000.3
+
+
+def test_index_declared_in_liters(tmp_path: Path) -> None:
+    """An index header in liters is converted to m3."""
+    header = HEADER.replace("Index relevé (m3)", "Index (litres)")
+    path = _write(tmp_path / "export.csv", 10, header=header, index_scale=1000)
+    records, result = read_history_file(path, ())
+    assert result.index_unit == "L"
+    assert records[-1].index_m3 == 1003.0
+
+
+def test_inconsistent_index_is_dropped(tmp_path: Path) -> None:
+    """An index that follows no unit of the consumption is ignored."""
+    path = _write(tmp_path / "export.csv", 10, index_scale=20)
+    records, result = read_history_file(path, ())
+    assert result.index_unit is None
+    assert all(rec.index_m3 is None for rec in records)
+    assert sum(rec.liters for rec in records) == 3000
+
+
+def test_ten_year_history_benchmark(tmp_path: Path) -> None:
+    """A 10-year export is parsed and modelled in well under a second each."""
+    days = (date(2025, 1, 1) - START).days
+    path = _write(tmp_path / "export.csv", days)
+
+    started = time.perf_counter()
+    records, result = read_history_file(path, ())
+    parsed = time.perf_counter() - started
+    started = time.perf_counter()
+    model = VeoliaModel.from_account_data(
+        None, records, [], today=date(2025, 1, 1), tz=ZoneInfo("Europe/Paris")
+    )
+    modelled = time.perf_counter() - started
+
+    assert len(records) == result.rows == days
+    assert model.computed.daily_stats_liters[-1]["sum"] == days * 300
+    # Filled up to today
+    assert len(model.computed.index_stats_m3) == days + 1
+    assert parsed < 1
+    assert modelled < 1
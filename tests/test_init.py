@@ -0,0 +1,55 @@
+"""Tests for the import cost of the Veolia integration."""
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+# Modules only needed once a config entry is set up
+DEFERRED = ("veolia_api", "custom_components.veolia.coordinator")
+# Own import time of the integration modules, without Home Assistant
+BUDGET_US = 200_000
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Return the self and cumulative import times of a fresh import."""
+    # A fresh interpreter, other tests may have imported the client already
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+@pytest.mark.parametrize(
+    "module", ["custom_components.veolia", "custom_components.veolia.config_flow"]
+)
+def test_import_defers_veolia_api(module: str) -> None:
+    """Importing the integration does not load the API client."""
+    pytest.importorskip("homeassistant")
+    times = _import_times(module)
+
+    assert module in times
+    assert not [
+        name
+        for name in times
+        for deferred in DEFERRED
+        if name == deferred or name.startswith(f"{deferred}.")
+    ]
+    own = sum(
+        times[name][0] for name in times if name.startswith("custom_components.veolia")
+    )
+    assert own < BUDGET_US
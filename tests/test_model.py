@@ -0,0 +1,65 @@
+"""Tests for the statistics rows of the model around DST transitions."""
+
+from datetime import date, datetime, timedelta
+from itertools import pairwise
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.veolia.model import VeoliaModel
+from custom_components.veolia.records import DailyRecord
+from custom_components.veolia.timeutil import day_start
+
+PARIS = ZoneInfo("Europe/Paris")
+SPRING_FORWARD = date(2025, 3, 30)
+FALL_BACK = date(2025, 10, 26)
+
+
+def _daily(around: date) -> list[DailyRecord]:
+    """Return a week of daily readings centered on a day."""
+    days = [around + timedelta(days=i) for i in range(-3, 4)]
+    return [
+        DailyRecord(d, 100 + 10 * i, 0.1, 500 + i, "Mesuré") for i, d in enumerate(days)
+    ]
+
+
+def _hourly(daily: list[DailyRecord]) -> dict[date, dict[datetime, int]]:
+    """Return 5 liters every local hour, short of the daily totals."""
+    return {
+        rec.day: {datetime(*rec.day.timetuple()[:3], h): 5 for h in range(20)}
+        for rec in daily
+    }
+
+
+def _day_totals(rows: list[dict]) -> dict[date, int]:
+    """Add up the row states per local day."""
+    totals: dict[date, int] = {}
+    for row in rows:
+        day = row["start"].astimezone(PARIS).date()
+        totals[day] = totals.get(day, 0) + row["state"]
+    return totals
+
+
+@pytest.mark.parametrize("around", [SPRING_FORWARD, FALL_BACK])
+@pytest.mark.parametrize("hourly", [False, True])
+def test_sums_match_the_daily_totals(around: date, hourly: bool) -> None:
+    """The rows of a DST week add up to the daily readings."""
+    daily = _daily(around)
+    model = VeoliaModel.from_account_data(
+        None,
+        daily,
+        [],
+        today=daily[-1].day,
+        tz=PARIS,
+        hourly=_hourly(daily) if hourly else {},
+    )
+    comp = model.computed
+    rows = comp.hourly_stats_liters if hourly else comp.daily_stats_liters
+
+    assert rows
+    assert _day_totals(rows) == {rec.day: rec.liters for rec in daily}
+    assert rows[-1]["sum"] == sum(rec.liters for rec in daily)
+    for prev, row in pairwise(rows):
+        assert row["start"] > prev["start"]
+        assert row["sum"] == prev["sum"] + row["state"]
+    assert rows[0]["start"] == day_start(daily[0].day, PARIS)
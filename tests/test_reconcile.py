@@ -0,0 +1,40 @@
+"""Tests for the reconciliation of the meter index."""
+
+from datetime import date, timedelta
+
+from custom_components.veolia.model import HistoryBase
+from custom_components.veolia.reconcile import REPLACEMENT, reconcile
+from custom_components.veolia.records import DailyRecord
+
+START = date(2022, 6, 1)
+
+
+def _history(days: int, replaced: int) -> list[DailyRecord]:
+    """Return daily readings of 300 liters, the meter replaced on day replaced."""
+    records = []
+    index = 500.0
+    for i in range(days):
+        index = round(index + 0.3, 3)
+        if i == replaced:
+            index = 0.3
+        records.append(
+            DailyRecord(START + timedelta(days=i), 300, 0.3, index, "Mesuré")
+        )
+    return records
+
+
+def test_archived_replacement_keeps_the_index() -> None:
+    """The index offset of an archived replacement carries over."""
+    records = _history(800, 100)
+    full = reconcile(records, [])
+    assert [event.kind for event in full.events] == [REPLACEMENT]
+
+    cut = next(i for i, rec in enumerate(records) if rec.day >= date(2024, 6, 1))
+    base = HistoryBase()
+    base.index = reconcile(records[:cut], [], base.index).index_state
+    # As saved with the cached history
+    base = HistoryBase.from_dict(base.as_dict())
+    kept = reconcile(records[cut:], [], base.index)
+
+    assert kept.index_points == full.index_points[cut:]
+    assert kept.index_points[-1][1] == full.index_points[-1][1]
@@ -0,0 +1,72 @@
+"""Tests for the local day boundaries around DST transitions."""
+
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.veolia.timeutil import day_start, hour_start, local_midnights
+
+PARIS = ZoneInfo("Europe/Paris")
+SPRING_FORWARD = date(2025, 3, 30)
+FALL_BACK = date(2025, 10, 26)
+
+
+def test_local_midnights_covers_the_year() -> None:
+    """Every local day of the year has a start, plus Jan 1st of the next year."""
+    midnights = local_midnights(2025, PARIS)
+    assert len(midnights) == 366
+    assert midnights[0] == datetime(2024, 12, 31, 23, tzinfo=UTC)
+    assert midnights[-1] == datetime(2025, 12, 31, 23, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    ("day", "hours"), [(SPRING_FORWARD, 23), (FALL_BACK, 25), (date(2025, 7, 1), 24)]
+)
+def test_local_midnights_day_lengths(day: date, hours: int) -> None:
+    """The DST transition days last 23 and 25 hours."""
+    midnights = local_midnights(2025, PARIS)
+    yday = day.timetuple().tm_yday
+    assert midnights[yday] - midnights[yday - 1] == timedelta(hours=hours)
+
+
+@pytest.mark.parametrize(
+    ("day", "start"),
+    [
+        (SPRING_FORWARD, datetime(2025, 3, 29, 23, tzinfo=UTC)),
+        (date(2025, 3, 31), datetime(2025, 3, 30, 22, tzinfo=UTC)),
+        (FALL_BACK, datetime(2025, 10, 25, 22, tzinfo=UTC)),
+        (date(2025, 10, 27), datetime(2025, 10, 26, 23, tzinfo=UTC)),
+    ],
+)
+def test_day_start(day: date, start: datetime) -> None:
+    """Days start at local midnight on both sides of the transitions."""
+    assert day_start(day, PARIS) == start
+
+
+@pytest.mark.parametrize(
+    ("hour", "start"),
+    [
+        (datetime(2025, 3, 30, 0), datetime(2025, 3, 29, 23, tzinfo=UTC)),
+        (datetime(2025, 3, 30, 1), datetime(2025, 3, 30, 0, tzinfo=UTC)),
+        (datetime(2025, 3, 30, 3), datetime(2025, 3, 30, 1, tzinfo=UTC)),
+        (datetime(2025, 3, 30, 23), datetime(2025, 3, 30, 21, tzinfo=UTC)),
+        (datetime(2025, 10, 26, 1), datetime(2025, 10, 25, 23, tzinfo=UTC)),
+        (datetime(2025, 10, 26, 2), datetime(2025, 10, 26, 0, tzinfo=UTC)),
+        (datetime(2025, 10, 26, 3), datetime(2025, 10, 26, 2, tzinfo=UTC)),
+        (datetime(2025, 10, 26, 23), datetime(2025, 10, 26, 22, tzinfo=UTC)),
+        (datetime(2025, 7, 1, 12), datetime(2025, 7, 1, 10, tzinfo=UTC)),
+    ],
+)
+def test_hour_start(hour: datetime, start: datetime) -> None:
+    """Local hours map to their UTC start, the first occurrence when repeated."""
+    assert hour_start(hour, PARIS) == start
+
+
+def test_hour_start_skipped_hour_stays_on_the_hour() -> None:
+    """The hour skipped by the spring-forward still starts on a full hour."""
+    start = hour_start(datetime(2025, 3, 30, 2), PARIS)
+    assert start.minute == start.second == 0
+    assert (
+        day_start(SPRING_FORWARD, PARIS) <= start < day_start(date(2025, 3, 31), PARIS)
+    )